@@ -0,0 +1,131 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+from archive import PLAY_COLUMNS, extract_play_rows
+
+
+#Columns kept as integer arrays, the others are object arrays
+INT_COLUMNS = ('play_id', 'period', 'minute', 'event_type_id', 'home_score', 'away_score')
+
+
+def _int(value):
+    return value if isinstance(value, int) else -1
+
+
+class PlayTable:
+    """ Array-backed table of play by play rows for vectorized season aggregations (requires numpy)"""
+    def __init__(self, rows):
+        """
+        rows (list): PLAY_COLUMNS tuples, such as PlayArchive.play_rows or archive.extract_play_rows output
+        """
+        if np is None:
+            raise ImportError('PlayTable requires numpy, pip install numpy')
+        columns = list(zip(*rows)) if rows else [()] * len(PLAY_COLUMNS)
+        self.columns = {}
+        for name, values in zip(PLAY_COLUMNS, columns):
+            if name in INT_COLUMNS:
+                #Missing values are stored as -1 so the column stays integer
+                self.columns[name] = np.fromiter((_int(value) for value in values), dtype=np.int64, count=len(values))
+            else:
+                self.columns[name] = np.array(values, dtype=object)
+
+    @classmethod
+    def from_archive(cls, archive, **filters):
+        """Load the archived plays matching the PlayArchive.plays filters, in one query"""
+        return cls(archive.play_rows(**filters))
+
+    @classmethod
+    def from_responses(cls, request, responses):
+        """Load plays from full (pbp=true) get_event_details responses
+        Args:
+            request: EPLRequest or NFLRequest whose schema reads the responses
+            responses (dict): event id to response
+        """
+        rows = []
+        for event_id, response in responses.items():
+            event = request.schema.event(response)
+            if event is not None:
+                rows.extend(extract_play_rows(request, event_id, event))
+        return cls(rows)
+
+    def __len__(self):
+        return len(self.columns['play_id'])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def mask(self, event_id=None, league=None, period=None, event_type=None, player=None):
+        """Boolean array selecting the plays matching every filter given"""
+        selected = np.ones(len(self), dtype=bool)
+        for name, value in (('event_id', event_id), ('league', league), ('period', period),
+                            ('event_type_name', event_type), ('player_name', player)):
+            if value is not None:
+                selected &= self.columns[name] == value
+        return selected
+
+    def score_progression(self, event_id, league=None):
+        """Scoring timeline of one match, one entry per play that changed the score
+        Pass league when the table holds both leagues, their event ids can be the same.
+        Returns:
+            dict: play_id, minute, home_score and away_score arrays
+        """
+        selected = self.mask(event_id=event_id, league=league)
+        home_score = self.columns['home_score'][selected]
+        away_score = self.columns['away_score'][selected]
+        changed = np.diff(home_score, prepend=0) != 0
+        changed |= np.diff(away_score, prepend=0) != 0
+        return {'play_id': self.columns['play_id'][selected][changed],
+                'minute': self.columns['minute'][selected][changed],
+                'home_score': home_score[changed],
+                'away_score': away_score[changed]}
+
+    def counts(self, by, selected=None):
+        """Count plays grouped by one or more columns
+        Args:
+            by (tuple): column names to group by, eg: ('period', 'event_type_name')
+            selected (array): optional boolean mask, see mask
+        Returns:
+            dict: group key tuple to number of plays
+        """
+        if selected is None:
+            selected = np.ones(len(self), dtype=bool)
+        keys, codes = [], np.zeros(int(selected.sum()), dtype=np.int64)
+        for name in by:
+            values, inverse = np.unique(self.columns[name][selected].astype(str) if self.columns[name].dtype == object else self.columns[name][selected], return_inverse=True)
+            codes = codes * len(values) + inverse
+            keys.append(values)
+        totals = np.bincount(codes) if len(codes) else np.zeros(0, dtype=np.int64)
+        groups = {}
+        for code in np.nonzero(totals)[0]:
+            key, remainder = [], int(code)
+            for values in reversed(keys):
+                remainder, index = divmod(remainder, len(values))
+                key.append(values[index].item())
+            groups[tuple(reversed(key))] = int(totals[code])
+        return groups
+
+    def event_counts(self, league=None):
+        """Plays by period and event type, optionally for one league"""
+        return self.counts(('period', 'event_type_name'), self.mask(league=league))
+
+    def minute_buckets(self, event_type, bucket_mins=15, league=None):
+        """Number of plays of one event type per match minute bucket, eg: goals per 15 minutes
+        Returns:
+            dict: first minute of the bucket to number of plays
+        """
+        selected = self.mask(league=league, event_type=event_type) & (self.columns['minute'] >= 0)
+        totals = np.bincount(self.columns['minute'][selected] // bucket_mins)
+        return dict((int(index) * bucket_mins, int(total)) for index, total in enumerate(totals) if total)
+
+    def touchdowns_per_period(self):
+        """Touchdown plays per NFL quarter"""
+        names = self.columns['event_type_name'].astype(str)
+        selected = (self.columns['league'] == 'NFL') & (np.char.endswith(names, ' Touchdown'))
+        return dict((key[0], total) for key, total in self.counts(('period',), selected).items())
+
+    def player_totals(self, event_type=None, league=None):
+        """Plays each player was involved in, most involved first"""
+        selected = self.mask(league=league, event_type=event_type) & (self.columns['player_name'] != '')
+        totals = self.counts(('player_name',), selected)
+        return sorted(((key[0], total) for key, total in totals.items()), key=lambda item: -item[1])
@@ -0,0 +1,190 @@
+import json
+import sqlite3
+import threading
+import zlib
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS events (
+    event_id TEXT,
+    league TEXT,
+    event_status_id INTEGER,
+    start_time_utc TEXT,
+    home_team_name TEXT,
+    away_team_name TEXT,
+    venue_name TEXT,
+    payload BLOB,
+    PRIMARY KEY (league, event_id)
+);
+CREATE TABLE IF NOT EXISTS plays (
+    event_id TEXT,
+    league TEXT,
+    play_id INTEGER,
+    period INTEGER,
+    minute INTEGER,
+    clock TEXT,
+    event_type_id INTEGER,
+    event_type_name TEXT,
+    home_score INTEGER,
+    away_score INTEGER,
+    player_name TEXT,
+    PRIMARY KEY (league, event_id, play_id)
+);
+CREATE INDEX IF NOT EXISTS events_league ON events (league);
+CREATE INDEX IF NOT EXISTS events_home_team ON events (home_team_name);
+CREATE INDEX IF NOT EXISTS events_away_team ON events (away_team_name);
+CREATE INDEX IF NOT EXISTS plays_league_period ON plays (league, period);
+CREATE INDEX IF NOT EXISTS plays_event_type ON plays (event_type_name);
+CREATE INDEX IF NOT EXISTS plays_player ON plays (player_name);
+PRAGMA user_version = 1;
+'''
+
+#Archives created before the tables were keyed by league (user_version 0) are rebuilt, keeping their rows
+MIGRATE_LEAGUE_KEYS = '''
+BEGIN;
+ALTER TABLE events RENAME TO events_old;
+ALTER TABLE plays RENAME TO plays_old;
+DROP INDEX IF EXISTS events_league;
+DROP INDEX IF EXISTS events_home_team;
+DROP INDEX IF EXISTS events_away_team;
+DROP INDEX IF EXISTS plays_league_period;
+DROP INDEX IF EXISTS plays_event_type;
+DROP INDEX IF EXISTS plays_player;
+''' + SCHEMA + '''
+INSERT INTO events SELECT * FROM events_old;
+INSERT INTO plays SELECT * FROM plays_old;
+DROP TABLE events_old;
+DROP TABLE plays_old;
+COMMIT;
+'''
+
+PLAY_COLUMNS = ('event_id', 'league', 'play_id', 'period', 'minute', 'clock', 'event_type_id', 'event_type_name', 'home_score', 'away_score', 'player_name')
+EVENT_COLUMNS = ('event_id', 'league', 'event_status_id', 'start_time_utc', 'home_team_name', 'away_team_name', 'venue_name')
+
+
+def extract_play_rows(request, event_id, event):
+    """Flatten the pbp list of an event object into PLAY_COLUMNS tuples
+    Each play goes through the league summarize_play, the extraction used by extract_event_details.
+    Args:
+        request: EPLRequest or NFLRequest whose schema reads the event
+        event_id (str): the stats.com event id
+        event (dict): the event object of a full (pbp=true) events API response
+    Returns:
+        list: one tuple per play, in pbp order
+    """
+    league = request.schema.league_name
+    play_rows = []
+    for pbp in event.get('pbp') or []:
+        play = request.summarize_play(pbp)
+        clock = play['current_time']
+        play_rows.append((event_id, league, request.schema.play_id(pbp), play['current_period'], request.play_minute(play),
+                          clock if isinstance(clock, str) else json.dumps(clock), play['last_pbp_event_id'], play['last_pbp_event_name'],
+                          play['home_score_after'], play['away_score_after'], play['player_name']))
+    return play_rows
+
+
+class PlayArchive:
+    """ Local SQLite archive of finished matches and their play by play, indexed for analyst queries"""
+    def __init__(self, path):
+        """
+        path (str): SQLite database file, created if missing
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        tables = set(row[0] for row in self.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'"))
+        self.connection.executescript(MIGRATE_LEAGUE_KEYS if version == 0 and 'events' in tables else SCHEMA)
+        self.lock = threading.Lock()
+
+    def store(self, request, event_id, response):
+        """Archive a get_event_details response and its plays, replacing any earlier copy
+        Args:
+            request: EPLRequest or NFLRequest whose schema reads the response
+            event_id (str): the stats.com event id
+            response (dict): the full (pbp=true) events API response
+        """
+        event = request.schema.event(response)
+        if event is None:
+            return
+        league = request.schema.league_name
+        home_team_name, away_team_name = request.team_names(event)
+        event_row = (event_id, league, request.schema.event_status_id(event), request.start_time_utc(event),
+                     home_team_name, away_team_name, (event.get('venue') or {}).get('name',""),
+                     zlib.compress(json.dumps(response).encode('utf-8')))
+        play_rows = extract_play_rows(request, event_id, event)
+        with self.lock, self.connection:
+            self.connection.execute('DELETE FROM plays WHERE league = ? AND event_id = ?', (league, event_id))
+            self.connection.execute('INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?)', event_row)
+            self.connection.executemany('INSERT OR REPLACE INTO plays VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', play_rows)
+
+    def load_response(self, league, event_id):
+        """The archived events API response of a match, or None if it is not archived
+        Args:
+            league (str): league of the match, event ids of different leagues can be the same
+            event_id (str): the stats.com event id
+        """
+        with self.lock:
+            row = self.connection.execute('SELECT payload FROM events WHERE league = ? AND event_id = ?', (league, event_id)).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]).decode('utf-8'))
+
+    def __contains__(self, key):
+        """Whether a match is archived, key being a (league, event id) pair, eg: ('EPL', '1913017') in archive"""
+        with self.lock:
+            return self.connection.execute('SELECT 1 FROM events WHERE league = ? AND event_id = ?', tuple(key)).fetchone() is not None
+
+    def events(self, league=None, team=None):
+        """Archived matches, optionally for one league and / or one team (home or away)
+        Returns:
+            list: one dict per match with the EVENT_COLUMNS keys
+        """
+        clauses, params = [], []
+        if league is not None:
+            clauses.append('league = ?')
+            params.append(league)
+        if team is not None:
+            clauses.append('(home_team_name = ? OR away_team_name = ?)')
+            params.extend([team, team])
+        query = 'SELECT ' + ', '.join(EVENT_COLUMNS) + ' FROM events'
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        with self.lock:
+            rows = self.connection.execute(query + ' ORDER BY start_time_utc', params).fetchall()
+        return [dict(zip(EVENT_COLUMNS, row)) for row in rows]
+
+    def plays(self, event_id=None, league=None, team=None, player=None, period=None, event_type=None):
+        """Archived plays matching every filter given
+        Args:
+            event_id (str): plays of one match
+            league (str): plays of one league, eg: 'EPL'
+            team (str): plays of the matches a team played, home or away
+            player (str): plays involving a player, as reported in player_name
+            period (int): plays of one period
+            event_type (str): plays of one event type name, eg: 'Goal' or 'Pass Touchdown'
+        Returns:
+            list: one dict per play with the PLAY_COLUMNS keys, in match and play order
+        """
+        rows = self.play_rows(event_id, league, team, player, period, event_type)
+        return [dict(zip(PLAY_COLUMNS, row)) for row in rows]
+
+    def play_rows(self, event_id=None, league=None, team=None, player=None, period=None, event_type=None):
+        """Same query as plays, returning raw PLAY_COLUMNS tuples for bulk loading"""
+        clauses, params = [], []
+        for column, value in (('event_id', event_id), ('league', league), ('player_name', player),
+                              ('period', period), ('event_type_name', event_type)):
+            if value is not None:
+                clauses.append('plays.' + column + ' = ?')
+                params.append(value)
+        query = 'SELECT ' + ', '.join('plays.' + column for column in PLAY_COLUMNS) + ' FROM plays'
+        if team is not None:
+            query += ' JOIN events ON events.league = plays.league AND events.event_id = plays.event_id'
+            clauses.append('(events.home_team_name = ? OR events.away_team_name = ?)')
+            params.extend([team, team])
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        with self.lock:
+            return self.connection.execute(query + ' ORDER BY plays.league, plays.event_id, plays.play_id', params).fetchall()
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,81 @@
+import asyncio
+import collections
+from concurrent.futures import ThreadPoolExecutor
+from stats_epl import EPLRequest
+from stats_nfl import NFLRequest
+
+
+#Result of one event in a fan-out batch, error is set instead of summary when the event failed
+EventResult = collections.namedtuple('EventResult', ['event_id', 'summary', 'error'])
+
+
+class AsyncRequest:
+    """ Asyncio client fanning extract_event_details out over many event ids"""
+    request_class = None
+
+    def __init__(self, config, concurrency=None, transport=None):
+        """
+        config: object containing api_key, secret and endpoints
+        concurrency: maximum number of event requests in flight, defaults to config.ASYNC_CONCURRENCY
+        transport: optional Transport to share a connection pool with other request objects
+        """
+        self.config = config
+        self.concurrency = concurrency or config.ASYNC_CONCURRENCY
+        self.request = self.request_class(config, transport)
+        #A transport passed in belongs to the caller, who closes it
+        self.owns_transport = transport is None
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency)
+
+    async def extract_event_details(self, event_id):
+        """Awaitable version of extract_event_details for a single event id
+        Args:
+            event_id (str): the stats.com event id.
+        Returns:
+            EventSummary: Same result as the synchronous extract_event_details.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.request.extract_event_details, event_id)
+
+    async def fetch_many(self, event_ids):
+        """Concurrently extract event details for many event ids
+        Args:
+            event_ids (iterable of str): stats.com event ids.
+        Yields:
+            EventResult: one per event id, in completion order. A failed event carries
+            the exception or the error message in error and None in summary.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(event_id):
+            async with semaphore:
+                try:
+                    summary = await self.extract_event_details(event_id)
+                except Exception as error:
+                    return EventResult(event_id, None, error)
+            if isinstance(summary, str):
+                return EventResult(event_id, None, summary)
+            return EventResult(event_id, summary, None)
+
+        tasks = [asyncio.ensure_future(fetch(event_id)) for event_id in event_ids]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def close(self):
+        """Shut down the worker threads and the pooled connections, unless the transport was passed in"""
+        self.executor.shutdown(wait=False)
+        if self.owns_transport:
+            self.request.transport.close()
+
+
+class AsyncEPLRequest(AsyncRequest):
+    """ Asyncio Stats.com EPL Request object"""
+    request_class = EPLRequest
+
+
+class AsyncNFLRequest(AsyncRequest):
+    """ Asyncio Stats.com NFL Request object"""
+    request_class = NFLRequest
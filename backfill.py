@@ -0,0 +1,96 @@
+import datetime
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+def parse_date(date):
+    """Parse a YYYYMMDD or YYYY-MM-DD date"""
+    return datetime.datetime.strptime(date.replace('-', ''), '%Y%m%d').date()
+
+
+def date_windows(start_date, end_date, window_days):
+    """Split an inclusive date range into consecutive windows of at most window_days days
+    Returns:
+        list: (start_date, end_date) pairs as YYYY-MM-DD strings
+    """
+    start = parse_date(start_date)
+    end = parse_date(end_date)
+    windows = []
+    while start <= end:
+        window_end = min(start + datetime.timedelta(days=window_days - 1), end)
+        windows.append((start.isoformat(), window_end.isoformat()))
+        start = window_end + datetime.timedelta(days=1)
+    return windows
+
+
+class ScheduleBackfill:
+    """ Resumable bulk schedule ingestion, fetching date windows concurrently"""
+    def __init__(self, request, start_date, end_date, window_days=None, workers=None, state_path=None):
+        """
+        request: EPLRequest or NFLRequest used to query the events API
+        start_date (str): YYYYMMDD or YYYY-MM-DD, first day of the backfill
+        end_date (str): YYYYMMDD or YYYY-MM-DD, last day of the backfill
+        window_days (int): days per get_events request, defaults to config.BACKFILL_WINDOW_DAYS
+        workers (int): windows fetched concurrently, defaults to config.BACKFILL_WORKERS
+        state_path (str): optional JSON file recording the completed windows so an interrupted backfill resumes
+        """
+        self.request = request
+        self.window_days = window_days or request.config.BACKFILL_WINDOW_DAYS
+        self.workers = workers or request.config.BACKFILL_WORKERS
+        self.state_path = state_path
+        self.windows = date_windows(start_date, end_date, self.window_days)
+        self.completed = set()
+        self.event_ids = set()
+        self.failed = []
+        if state_path and os.path.exists(state_path):
+            with open(state_path) as state_file:
+                state = json.load(state_file)
+            self.completed = set(tuple(window) for window in state.get('completed', []))
+            self.event_ids = set(state.get('event_ids', []))
+
+    def pending(self):
+        """Windows not fetched yet, in date order"""
+        return [window for window in self.windows if window not in self.completed]
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        state = {'completed': sorted(self.completed), 'event_ids': sorted(self.event_ids)}
+        state_tmp_path = self.state_path + '.tmp'
+        with open(state_tmp_path, 'w') as state_file:
+            json.dump(state, state_file)
+        os.replace(state_tmp_path, self.state_path)
+
+    def __iter__(self):
+        """Yield each MatchSummary once, as its window arrives
+        Matches of windows completed by a previous run are not yielded again. Windows that
+        failed are listed in failed and stay pending, so running the backfill again retries them.
+        """
+        self.failed = []
+        #Shut down in finally rather than a with block: a consumer that stops iterating early
+        #must not wait for every remaining window to be fetched
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futures = dict((executor.submit(self.request.get_events, window[0], window[1]), window) for window in self.pending())
+            for future in as_completed(futures):
+                window = futures[future]
+                try:
+                    matches = future.result()
+                except Exception:
+                    matches = None
+                if matches is None:
+                    self.failed.append(window)
+                    continue
+                new_matches = []
+                for match in matches:
+                    if match.event_id not in self.event_ids:
+                        self.event_ids.add(match.event_id)
+                        new_matches.append(match)
+                for match in new_matches:
+                    yield match
+                #Only record the window once its matches have been consumed
+                self.completed.add(window)
+                self._save_state()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
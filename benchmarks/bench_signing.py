@@ -0,0 +1,40 @@
+import hashlib
+import time
+import timeit
+from config import Config
+from stats_epl import EPLRequest
+
+#Per request cost of signing and building an event url, run from the repo root:
+#python -m benchmarks.bench_signing
+
+
+def legacy_signed_url(api_key, secret, api_host, events_path, query):
+    """The url building every request did before Signer and URLTemplate"""
+    sig_e = str(api_key + secret + str(int(time.time()))).encode('utf-8')
+    hash = hashlib.sha256()
+    hash.update(sig_e)
+    sig = hash.hexdigest()
+    return api_host + events_path + '?' + query + 'api_key=' + api_key + '&sig=' + sig
+
+
+def run(number=200000):
+    """Time number event urls built each way
+    Returns:
+        dict: microseconds per url before and after, and the signatures the Signer computed
+    """
+    request = EPLRequest(Config)
+    event_id = '1913017'
+    before = timeit.timeit(lambda: legacy_signed_url(Config.API_KEY, Config.SECRET, Config.API_HOST,
+                                                     Config.EPL_EVENTS_PATH + event_id, 'pbp=true&'), number=number)
+    computed = request.signer.computed
+    after = timeit.timeit(lambda: request.event_url.url(event_id), number=number)
+    request.transport.close()
+    return {'before_us': before / number * 1e6, 'after_us': after / number * 1e6,
+            'signatures': request.signer.computed - computed, 'urls': number}
+
+
+if __name__ == '__main__':
+    result = run()
+    print(u'signed url before: {0:.2f} us, after: {1:.2f} us, {2:.1f}x'.format(
+        result['before_us'], result['after_us'], result['before_us'] / result['after_us']))
+    print(u'{0} signatures computed for {1} urls'.format(result['signatures'], result['urls']))
@@ -0,0 +1,185 @@
+import json
+import os
+import random
+import sys
+
+#Events API response fixtures for the benchmarks. Recorded responses saved under
+#benchmarks/fixtures/ are used when present, otherwise a deterministic payload of the
+#same shape and size is built. Record one with a real API key in config.py:
+#python -m benchmarks.fixtures record EPL 1913017 full
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+#Play by play entries per fixture size: a few minutes in, a full match, a match going to extra time / overtime
+PBP_SIZES = {
+    'EPL': {'small': 40, 'full': 1700, 'overtime': 2300},
+    'NFL': {'small': 20, 'full': 175, 'overtime': 210},
+}
+SIZES = ('small', 'full', 'overtime')
+EVENTS_KEYS = {'EPL': 'matches', 'NFL': 'events'}
+
+EPL_PLAY_EVENTS = ((1, 'Pass'), (1, 'Pass'), (1, 'Pass'), (2, 'Clearance'), (3, 'Tackle'), (4, 'Foul'),
+                   (5, 'Shot Off Target'), (6, 'Corner Kick'), (8, 'Offside'), (9, 'Substitution'))
+EPL_GOAL = (11, 'Goal')
+EPL_HALF_OVER = (13, 'Half Over')
+NFL_PLAY_TYPES = ((1, 'Rush'), (1, 'Rush'), (2, 'Pass'), (2, 'Pass'), (3, 'Punt'), (4, 'Field Goal'), (5, 'Kickoff'))
+
+
+def _team(team_id, location, nickname, side):
+    return {'teamId': team_id, 'location': location, 'nickname': nickname, 'abbreviation': nickname[:3].upper(),
+            'teamLocationType': {'teamLocationTypeId': 1 if side == 'home' else 2, 'name': side}}
+
+
+def _player(rng, team_id):
+    player_id = rng.randint(100000, 999999)
+    first_name, last_name = rng.choice(('Harry', 'Mo', 'Kevin', 'Tom', 'Aaron')), rng.choice(('Kane', 'Salah', 'Brady', 'Rodgers', 'De Bruyne'))
+    return {'playerId': player_id, 'teamId': team_id, 'firstName': first_name, 'lastName': last_name,
+            'displayName': first_name + ' ' + last_name, 'uniform': str(rng.randint(1, 99))}
+
+
+def _event(league, event_id, status_id, rng):
+    event = {'eventId': int(event_id), 'eventStatus': {'eventStatusId': status_id, 'name': {2: 'In-Progress', 4: 'Final'}.get(status_id, 'Pre-Game'), 'isActive': status_id == 2},
+             'startDate': [{'dateType': 'Local', 'full': '2017-08-21T15:00:00'}, {'dateType': 'UTC', 'full': '2017-08-21T14:00:00'}],
+             'isTba': False, 'isDataConfirmed': {'score': True, 'playByPlay': True},
+             'venue': {'venueId': rng.randint(1, 999), 'name': 'Stadium ' + str(event_id), 'city': 'London', 'country': {'countryId': 1, 'name': 'England'}},
+             'teams': [_team(1, 'Home', 'United', 'home'), _team(2, 'Away', 'City', 'away')]}
+    return event
+
+
+def epl_pbp(plays, rng):
+    """EPL pbp entries: two halves of 45 minutes, then extra time past 2000 plays"""
+    pbp, home_score, away_score = [], 0, 0
+    periods = 4 if plays > 2000 else 2
+    plays_per_period = plays // periods
+    for index in range(plays):
+        period = min(index // plays_per_period, periods - 1) + 1
+        period_start_mins = (0, 45, 90, 105)[period - 1]
+        period_mins = 45 if period <= 2 else 15
+        minutes = period_start_mins + (index % plays_per_period) * period_mins // plays_per_period
+        if index == plays_per_period - 1:
+            play_event = EPL_HALF_OVER
+        elif rng.random() < 0.0015:
+            play_event = EPL_GOAL
+        else:
+            play_event = rng.choice(EPL_PLAY_EVENTS)
+        team_id = rng.choice((1, 2))
+        if play_event == EPL_GOAL:
+            home_score, away_score = home_score + (team_id == 1), away_score + (team_id == 2)
+        play = {'sequenceNumber': index + 1, 'period': period,
+                'time': {'minutes': minutes, 'seconds': rng.randint(0, 59), 'additionalMinutes': 0},
+                'playEvent': {'playEventId': play_event[0], 'name': play_event[1]}, 'teamId': team_id,
+                'homeScore': home_score, 'awayScore': away_score,
+                'fieldPosition': {'xCoordinate': rng.randint(0, 100), 'yCoordinate': rng.randint(0, 100)},
+                'offensivePlayer': _player(rng, team_id)}
+        if play_event[1] == 'Substitution':
+            play['replacedPlayer'] = _player(rng, team_id)
+        elif rng.random() < 0.3:
+            play['defensivePlayer'] = _player(rng, 3 - team_id)
+        pbp.append(play)
+    return pbp
+
+
+def nfl_pbp(plays, rng):
+    """NFL pbp entries: four quarters of 15 minutes, then overtime past 200 plays"""
+    pbp, home_score, away_score = [], 0, 0
+    periods = 5 if plays > 200 else 4
+    plays_per_period = plays // periods
+    for index in range(plays):
+        period = min(index // plays_per_period, periods - 1) + 1
+        remaining = 900 - (index % plays_per_period) * 900 // plays_per_period
+        play_type = rng.choice(NFL_PLAY_TYPES)
+        home_score_before, away_score_before = home_score, away_score
+        if play_type[0] in (1, 2) and rng.random() < 0.04:
+            if rng.random() < 0.5:
+                home_score += 6
+            else:
+                away_score += 6
+        elif play_type[1] == 'Field Goal' and rng.random() < 0.3:
+            home_score += 3
+        pbp.append({'playId': index + 1, 'period': period, 'time': '{0}:{1:02d}'.format(remaining // 60, remaining % 60),
+                    'playType': {'playTypeId': play_type[0], 'name': play_type[1]},
+                    'down': rng.randint(1, 4), 'yardsToGo': rng.randint(1, 10), 'yards': rng.randint(-5, 40),
+                    'homeScoreBefore': home_score_before, 'awayScoreBefore': away_score_before,
+                    'homeScoreAfter': home_score, 'awayScoreAfter': away_score,
+                    'description': '(' + str(remaining // 60) + ':' + str(remaining % 60) + ') play ' + str(index + 1),
+                    'playersInvolved': [{'typeSequence': 1, 'playerInvolvedType': 'player', 'player': _player(rng, 1)},
+                                        {'typeSequence': 2, 'playerInvolvedType': 'tackler', 'player': _player(rng, 2)}]})
+    return pbp
+
+
+def wrap(league, events):
+    """Events API envelope around a list of event objects"""
+    return {'status': 'OK', 'recordCount': len(events),
+            'apiResults': [{'sportId': 1, 'league': {'leagueId': 1, 'abbreviation': league,
+                                                      'season': {'season': 2017, 'eventType': [{'eventTypeId': 1, 'name': 'Regular Season', EVENTS_KEYS[league]: events}]}}}]}
+
+
+def build_event(league, event_id, size):
+    """Synthetic full (pbp=true) get_event_details response, small being the opening minutes of a live full match"""
+    rng = random.Random(league + str(event_id) + size)
+    event = _event(league, event_id, 2 if size == 'small' else 4, rng)
+    build_pbp = epl_pbp if league == 'EPL' else nfl_pbp
+    if size == 'small':
+        event['pbp'] = build_pbp(PBP_SIZES[league]['full'], rng)[:PBP_SIZES[league]['small']]
+    else:
+        event['pbp'] = build_pbp(PBP_SIZES[league][size], rng)
+    if league == 'NFL':
+        event['lastPlay'] = event['pbp'][-1]
+    return wrap(league, [event])
+
+
+def build_schedule(league, matches, first_event_id=1000):
+    """Synthetic get_events response listing matches events"""
+    rng = random.Random(league + str(matches))
+    return wrap(league, [_event(league, first_event_id + index, 1, rng) for index in range(matches)])
+
+
+def fixture_path(league, size):
+    return os.path.join(FIXTURES_DIR, league.lower() + '_' + size + '.json')
+
+
+def load_event(league, size):
+    """The full response fixture of a league and size, recorded when available
+    Returns:
+        dict: a get_event_details (pbp=true) response
+    """
+    path = fixture_path(league, size)
+    if os.path.exists(path):
+        with open(path) as fixture_file:
+            return json.load(fixture_file)
+    return build_event(league, 1, size)
+
+
+def light_response(league, response):
+    """The pbp=false form of a full response: no pbp list, NFL events carrying lastPlay instead"""
+    events = []
+    for event in response['apiResults'][0]['league']['season']['eventType'][0][EVENTS_KEYS[league]]:
+        event = dict(event)
+        pbp = event.pop('pbp', None) or []
+        if league == 'NFL' and pbp:
+            event['lastPlay'] = pbp[-1]
+        events.append(event)
+    return wrap(league, events)
+
+
+def record(league, event_id, size):
+    """Save the live API response of a match as the fixture of a size, using the keys in config.py"""
+    from config import Config
+    from stats_epl import EPLRequest
+    from stats_nfl import NFLRequest
+    request = {'EPL': EPLRequest, 'NFL': NFLRequest}[league](Config)
+    response = request.get_event_details(event_id)
+    request.transport.close()
+    if response is None:
+        return None
+    if not os.path.isdir(FIXTURES_DIR):
+        os.makedirs(FIXTURES_DIR)
+    with open(fixture_path(league, size), 'w') as fixture_file:
+        json.dump(response, fixture_file)
+    return fixture_path(league, size)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 5 or sys.argv[1] != 'record' or sys.argv[4] not in SIZES:
+        sys.exit('usage: python -m benchmarks.fixtures record EPL|NFL EVENT_ID ' + '|'.join(SIZES))
+    print(record(sys.argv[2], sys.argv[3], sys.argv[4]) or 'No response received, check event id')
@@ -0,0 +1,145 @@
+import argparse
+import inspect
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from benchmarks import suite
+
+#Run the benchmark suite and track regressions between versions, from the repo root:
+#python -m benchmarks.run                      save results to benchmarks/results/<commit>.json
+#python -m benchmarks.run --compare abc1234    also compare with the results saved for commit abc1234
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def git_revision():
+    """Short commit id of the working tree, suffixed with -dirty when it has local changes"""
+    try:
+        revision = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+        dirty = subprocess.call(['git', 'diff', '--quiet', 'HEAD', '--', '*.py'], stderr=subprocess.DEVNULL) != 0
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return revision + ('-dirty' if dirty else '')
+
+
+def benchmarks(pattern=None):
+    """(name, class, method name, params) for every time_* method and param combination of the suite"""
+    for class_name, cls in inspect.getmembers(suite, inspect.isclass):
+        if cls.__module__ != suite.__name__:
+            continue
+        methods = sorted(name for name in dir(cls) if name.startswith('time_'))
+        for params in itertools.product(*getattr(cls, 'params', ())):
+            for method in methods:
+                name = class_name + '.' + method + ('(' + ', '.join(str(param) for param in params) + ')' if params else '')
+                if pattern is None or pattern in name:
+                    yield name, cls, method, params
+
+
+def measure(function, min_time, repeat):
+    """Seconds per call of function: calls are batched until a batch takes min_time, then repeated
+    Returns:
+        dict: median and min seconds per call, calls per batch and number of batches
+    """
+    number = 1
+    while True:
+        elapsed = timeit.timeit(function, number=number)
+        if elapsed >= min_time or number >= 1000000:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    timings = [elapsed / number] + [timeit.timeit(function, number=number) / number for _ in range(repeat - 1)]
+    return {'median': statistics.median(timings), 'min': min(timings), 'number': number, 'repeat': repeat}
+
+
+def run(pattern=None, min_time=0.2, repeat=5):
+    """Time every benchmark matching pattern
+    Returns:
+        dict: name to measure result
+    """
+    results = {}
+    for (cls, params), group in itertools.groupby(benchmarks(pattern), key=lambda item: (item[1], item[3])):
+        instance = cls()
+        if hasattr(instance, 'setup'):
+            instance.setup(*params)
+        try:
+            for name, _, method, _ in group:
+                bound = getattr(instance, method)
+                results[name] = measure(lambda: bound(*params), min_time, repeat)
+                print(u'{0:<60} {1}'.format(name, format_time(results[name]['median'])))
+        finally:
+            if hasattr(instance, 'teardown'):
+                instance.teardown(*params)
+    return results
+
+
+def format_time(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e3), ('us', 1e6)):
+        if seconds * scale >= 1:
+            return '{0:.3f} {1}'.format(seconds * scale, unit)
+    return '{0:.1f} ns'.format(seconds * 1e9)
+
+
+def results_path(label):
+    return label if label.endswith('.json') else os.path.join(RESULTS_DIR, label + '.json')
+
+
+def save(label, results):
+    if not os.path.isdir(RESULTS_DIR):
+        os.makedirs(RESULTS_DIR)
+    record = {'revision': label, 'python': platform.python_version(), 'machine': platform.machine(),
+              'date': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'benchmarks': results}
+    with open(results_path(label), 'w') as results_file:
+        json.dump(record, results_file, indent=4, sort_keys=True)
+    return results_path(label)
+
+
+def compare(base, results, threshold):
+    """Print the change of every benchmark against saved base results
+    Args:
+        base (dict): results saved by a previous run
+        results (dict): results of this run
+        threshold (float): relative slowdown reported as a regression, eg: 0.1 for 10%
+    Returns:
+        list: names of the regressed benchmarks
+    """
+    regressions = []
+    print(u'\n{0:<60} {1:>12} {2:>12} {3:>8}'.format('benchmark vs ' + base['revision'], 'before', 'after', 'ratio'))
+    for name in sorted(results):
+        if name not in base['benchmarks']:
+            continue
+        before, after = base['benchmarks'][name]['median'], results[name]['median']
+        ratio = after / before if before else float('inf')
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = ' REGRESSION'
+            regressions.append(name)
+        elif ratio < 1 / (1 + threshold):
+            flag = ' faster'
+        print(u'{0:<60} {1:>12} {2:>12} {3:>7.2f}x{4}'.format(name, format_time(before), format_time(after), ratio, flag))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the benchmark suite and compare with a previous version')
+    parser.add_argument('--filter', default=None, help='only run benchmarks whose name contains this, eg: ParseTime')
+    parser.add_argument('--label', default=None, help='name the results are saved under, defaults to the git commit')
+    parser.add_argument('--compare', default=None, help='label or results file of a previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative slowdown reported as a regression')
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds each timed batch runs for')
+    parser.add_argument('--repeat', type=int, default=5, help='timed batches per benchmark')
+    parser.add_argument('--latency', type=float, default=suite.LATENCY, help='stand-in server latency in seconds')
+    args = parser.parse_args()
+
+    suite.LATENCY = args.latency
+    results = run(args.filter, args.min_time, args.repeat)
+    print(u'Saved {0}'.format(save(args.label or git_revision(), results)))
+    if args.compare:
+        with open(results_path(args.compare)) as base_file:
+            regressions = compare(json.load(base_file), results, args.threshold)
+        if regressions:
+            sys.exit(u'{0} benchmarks regressed by more than {1:.0%}'.format(len(regressions), args.threshold))
@@ -0,0 +1,136 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from config import Config
+from benchmarks import fixtures
+
+#Local stand-in for the stats.com events API, serving the benchmark fixtures with a set latency:
+#python -m benchmarks.server --port 8080 --latency 0.05
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    #Headers and body go out in separate writes, Nagle would hold the body back for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = [part for part in url.path.split('/') if part]
+        league = 'EPL' if 'epl' in parts else 'NFL'
+        if parts and parts[-1] in ('matches', 'events'):
+            body = server.schedule(league)
+        else:
+            body = server.event(league, parts[-1] if parts else '', query.get('pbp') == ['true'])
+        server.count()
+        delay = server.latency + (random.uniform(0, server.jitter) if server.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        if body is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StandInServer(ThreadingHTTPServer):
+    """ Threaded HTTP server answering events API requests from the fixtures"""
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, jitter=0.0, size='full', schedule_matches=20, port=0):
+        """
+        latency (float): seconds added to every response, the round trip to stats.com
+        jitter (float): up to this many random extra seconds per response
+        size (str): fixture size served for every event id, see fixtures.SIZES
+        schedule_matches (int): matches listed by get_events responses
+        port (int): listening port, 0 picks a free one
+        """
+        ThreadingHTTPServer.__init__(self, ('127.0.0.1', port), StandInHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.size = size
+        self.schedule_matches = schedule_matches
+        self.requests_served = 0
+        self.lock = threading.Lock()
+        self.bodies = {}
+        self.thread = None
+
+    def count(self):
+        with self.lock:
+            self.requests_served += 1
+
+    def _body(self, key, build):
+        #Responses are encoded once, serving them should cost the server as little as possible
+        body = self.bodies.get(key)
+        if body is None:
+            body = json.dumps(build()).encode('utf-8')
+            self.bodies[key] = body
+        return body
+
+    def schedule(self, league):
+        return self._body((league, 'schedule'), lambda: fixtures.build_schedule(league, self.schedule_matches))
+
+    def event(self, league, event_id, pbp):
+        if not event_id.isdigit():
+            return None
+        full = lambda: fixtures.load_event(league, self.size)
+        if pbp:
+            return self._body((league, self.size, True), full)
+        return self._body((league, self.size, False), lambda: fixtures.light_response(league, full()))
+
+    @property
+    def api_host(self):
+        return 'http://127.0.0.1:{0}/v1/stats/'.format(self.server_address[1])
+
+    def config(self, **settings):
+        """Config subclass pointing at this server, without response cache, rate limit or archive
+        Args:
+            settings: Config attributes to override, eg: ASYNC_CONCURRENCY=32
+        """
+        overrides = {'API_HOST': self.api_host, 'CACHE_ENABLED': False, 'RATE_LIMIT_PER_SEC': None, 'ARCHIVE_PATH': None}
+        overrides.update(settings)
+        return type('StandInConfig', (Config,), overrides)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve the benchmark fixtures as a local events API')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='up to this many random extra seconds per response')
+    parser.add_argument('--size', choices=fixtures.SIZES, default='full', help='fixture size served for every event')
+    args = parser.parse_args()
+    server = StandInServer(args.latency, args.jitter, args.size, port=args.port)
+    print(u'Serving {0} ... set Config.API_HOST to it'.format(server.api_host))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
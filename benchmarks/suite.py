@@ -0,0 +1,107 @@
+import asyncio
+import json
+from config import Config
+from archive import extract_play_rows
+from async_client import AsyncEPLRequest, AsyncNFLRequest
+from stats_epl import EPLRequest
+from stats_nfl import NFLRequest
+from benchmarks import fixtures
+from benchmarks.server import StandInServer
+
+#asv-style benchmarks, run and compared by benchmarks/run.py: every time_* method of a class
+#is timed once per combination of its params, after setup(*params) and before teardown(*params)
+
+LEAGUES = {'EPL': EPLRequest, 'NFL': NFLRequest}
+ASYNC_LEAGUES = {'EPL': AsyncEPLRequest, 'NFL': AsyncNFLRequest}
+
+#Round trip to the stand-in server, in seconds
+LATENCY = 0.02
+
+#Offline config for the benchmarks that never reach the network
+OfflineConfig = type('OfflineConfig', (Config,), {'CACHE_ENABLED': False, 'RATE_LIMIT_PER_SEC': None, 'ARCHIVE_PATH': None})
+
+
+class ParseTime:
+    """ Decoding and summarizing a full response, without the network"""
+    params = (('EPL', 'NFL'), fixtures.SIZES)
+    param_names = ('league', 'size')
+
+    def setup(self, league, size):
+        self.request = LEAGUES[league](OfflineConfig)
+        self.body = json.dumps(fixtures.load_event(league, size)).encode('utf-8')
+        self.response = self.request.transport.loads(self.body)
+        self.event = self.request.schema.event(self.response)
+
+    def teardown(self, league, size):
+        self.request.transport.close()
+
+    def time_decode(self, league, size):
+        self.request.transport.loads(self.body)
+
+    def time_summarize_event(self, league, size):
+        self.request.summarize_event(self.request.schema.event(self.response), '1')
+
+    def time_extract_play_rows(self, league, size):
+        extract_play_rows(self.request, '1', self.event)
+
+
+class SignedURL:
+    """ Signing and building the url of one event request"""
+    def setup(self):
+        self.request = EPLRequest(OfflineConfig)
+
+    def teardown(self):
+        self.request.transport.close()
+
+    def time_event_url(self):
+        self.request.event_url.url('1913017')
+
+
+class PollLatency:
+    """ One poll end to end against the stand-in server: request, transfer, decode and summarize"""
+    params = (('EPL', 'NFL'), ('small', 'full'))
+    param_names = ('league', 'size')
+
+    def setup(self, league, size):
+        self.server = StandInServer(LATENCY, size=size).start()
+        self.request = LEAGUES[league](self.server.config())
+
+    def teardown(self, league, size):
+        self.request.transport.close()
+        self.server.stop()
+
+    def time_extract_event_details(self, league, size):
+        self.request.extract_event_details('1')
+
+    def time_get_event_details_light(self, league, size):
+        self.request.get_event_details('1', pbp=False)
+
+    def time_get_events(self, league, size):
+        self.request.get_events('2017-08-21', '2017-08-27')
+
+
+class Throughput:
+    """ Many matches extracted at once, sequentially and through the asyncio fan-out"""
+    params = (('EPL', 'NFL'), (10, 50))
+    param_names = ('league', 'matches')
+
+    def setup(self, league, matches):
+        self.server = StandInServer(LATENCY, size='full').start()
+        config = self.server.config()
+        self.request = LEAGUES[league](config)
+        self.async_request = ASYNC_LEAGUES[league](config)
+        self.event_ids = [str(1000 + index) for index in range(matches)]
+
+    def teardown(self, league, matches):
+        self.request.transport.close()
+        self.async_request.close()
+        self.server.stop()
+
+    def time_sequential(self, league, matches):
+        for event_id in self.event_ids:
+            self.request.extract_event_details(event_id)
+
+    def time_fetch_many(self, league, matches):
+        async def fetch_all():
+            return [result async for result in self.async_request.fetch_many(self.event_ids)]
+        asyncio.run(fetch_all())
@@ -0,0 +1,170 @@
+import collections
+import datetime
+import json
+import sqlite3
+import threading
+import time
+import scheduler
+
+
+class CacheEntry:
+    """ Cached payload with its expiry and the validators to revalidate it"""
+    __slots__ = ('value', 'expires', 'etag', 'last_modified')
+
+    def __init__(self, value, expires, etag=None, last_modified=None):
+        self.value = value
+        self.expires = expires
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def fresh(self, now=None):
+        return (now if now is not None else time.time()) < self.expires
+
+    def validators(self):
+        """Conditional request headers for a stale entry, None if the API sent no validators"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers or None
+
+
+class LRUCache:
+    """ In-memory least recently used cache of CacheEntry"""
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = collections.OrderedDict()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class DiskCache:
+    """ SQLite backed store of CacheEntry so the cache survives restarts"""
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, expires REAL, etag TEXT, last_modified TEXT)')
+        self.connection.commit()
+
+    def get(self, key):
+        row = self.connection.execute('SELECT value, expires, etag, last_modified FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(json.loads(row[0]), row[1], row[2], row[3])
+
+    def set(self, key, entry):
+        self.connection.execute('INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)',
+                                (key, json.dumps(entry.value), entry.expires, entry.etag, entry.last_modified))
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+class ResponseCache:
+    """ Two level response cache, an in-memory LRU in front of an optional on-disk store"""
+    def __init__(self, config):
+        """
+        config: object containing CACHE_MAX_ENTRIES and CACHE_PATH
+        """
+        self.memory = LRUCache(config.CACHE_MAX_ENTRIES)
+        self.disk = DiskCache(config.CACHE_PATH) if config.CACHE_PATH else None
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    def lookup(self, key):
+        """Find the entry stored under key, fresh or stale
+        Args:
+            key (str): cache key, the request path and parameters without the signature
+        Returns:
+            CacheEntry: the entry, or None if nothing is cached. A fresh entry counts as a hit.
+        """
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is None and self.disk is not None:
+                entry = self.disk.get(key)
+                if entry is not None:
+                    self.memory.set(key, entry)
+            if entry is not None and entry.fresh():
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry
+
+    def store(self, key, value, ttl, etag=None, last_modified=None):
+        """Cache a payload for ttl seconds along with its validators"""
+        entry = CacheEntry(value, time.time() + ttl, etag, last_modified)
+        with self.lock:
+            self.memory.set(key, entry)
+            if self.disk is not None:
+                self.disk.set(key, entry)
+
+    def revalidated(self, key, entry, ttl):
+        """Extend a stale entry after the API answered 304 Not Modified"""
+        with self.lock:
+            self.revalidations += 1
+        self.store(key, entry.value, ttl, entry.etag, entry.last_modified)
+
+    def stats(self):
+        """Counters for monitoring, hits / misses / revalidations and the number of entries in memory"""
+        return {'hits': self.hits, 'misses': self.misses, 'revalidations': self.revalidations, 'entries': len(self.memory)}
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+
+
+def schedule_ttl(config, end_date):
+    """TTL policy for a get_events schedule, long once the whole date range is in the past"""
+    end = datetime.datetime.strptime(end_date.replace('-', ''), '%Y%m%d').date()
+    if end < datetime.datetime.now(datetime.timezone.utc).date():
+        return lambda payload: config.CACHE_TTL_PAST_SCHEDULE
+    return lambda payload: config.CACHE_TTL_SCHEDULE
+
+
+def event_ttl(config, event_of):
+    """TTL policy for a get_event_details payload, driven by the event status
+    event_of: callable returning the event object of a payload, eg: LeagueSchema.event
+    """
+    def ttl(payload):
+        event = event_of(payload) or {}
+        event_status_id = (event.get('eventStatus') or {}).get('eventStatusId')
+        if event_status_id == 4:
+            return config.CACHE_TTL_FINAL
+        if event_status_id == 2:
+            return config.CACHE_TTL_LIVE
+        if event_status_id == 1:
+            #Never hide a kickoff: a not started event is cached until kickoff at the latest and
+            #from then on no longer than a live poll interval
+            kickoff = kickoff_epoch(event)
+            if kickoff is not None and kickoff > time.time():
+                return min(config.CACHE_TTL_SCHEDULED, kickoff - time.time())
+            return min(config.CACHE_TTL_SCHEDULED, config.POLL_INTERVAL)
+        return config.CACHE_TTL_SCHEDULED
+    return ttl
+
+
+def kickoff_epoch(event):
+    """Start time of an event object in epoch seconds, None when it has no UTC start date"""
+    for start_date in event.get('startDate') or []:
+        if start_date.get('dateType') == 'UTC' and start_date.get('full'):
+            try:
+                return scheduler.epoch_from_utc(start_date['full'])
+            except ValueError:
+                return None
+    return None
@@ -4,3 +4,64 @@ class Config(object):
     API_HOST = 'http://api.stats.com/v1/stats/'
     NFL_EVENTS_PATH = 'football/nfl/events/'
     EPL_EVENTS_PATH = 'soccer/epl/matches/'
+    #HTTP transport shared by EPLRequest and NFLRequest
+    HTTP_POOL_CONNECTIONS = 4
+    HTTP_POOL_SIZE = 32
+    HTTP_CONNECT_TIMEOUT = 3.05
+    HTTP_READ_TIMEOUT = 10
+    HTTP_MAX_RETRIES = 3
+    HTTP_BACKOFF_FACTOR = 0.5
+    #Response body decoder: 'auto' uses orjson when installed, 'orjson' or 'json'
+    JSON_DECODER = 'auto'
+    #Client-side token bucket per API key, RATE_LIMIT_PER_SEC = None disables it. Live match requests are served
+    #before schedule refreshes and a 429 response pauses the bucket for its Retry-After delay
+    #The bucket is per process: run_poller.py splits it evenly between its POLLER_WORKERS, other processes sharing the key must be given their own share
+    RATE_LIMIT_PER_SEC = 5
+    RATE_LIMIT_BURST = 10
+    #Optional requests allowed per UTC day, only reported by the limiter usage()
+    RATE_LIMIT_DAILY_BUDGET = None
+    #Maximum event requests in flight for AsyncEPLRequest / AsyncNFLRequest
+    ASYNC_CONCURRENCY = 16
+    #Seconds between polls of a live match, in its closing minutes, and the ceiling a quiet match backs off to
+    POLL_INTERVAL = 5
+    POLL_CLOSING_INTERVAL = 2
+    POLL_MAX_INTERVAL = 60
+    #Response cache, CACHE_PATH is an optional SQLite file so the cache survives restarts
+    CACHE_ENABLED = True
+    CACHE_MAX_ENTRIES = 512
+    CACHE_PATH = None
+    #Cache TTLs in seconds by what is cached, a not started event at most until kickoff, then POLL_INTERVAL
+    CACHE_TTL_LIVE = 2
+    CACHE_TTL_SCHEDULED = 300
+    CACHE_TTL_FINAL = 7 * 24 * 3600
+    CACHE_TTL_SCHEDULE = 3600
+    CACHE_TTL_PAST_SCHEDULE = 7 * 24 * 3600
+    #Season schedule backfills: days per get_events request and windows fetched concurrently
+    BACKFILL_WINDOW_DAYS = 7
+    BACKFILL_WORKERS = 4
+    #Optional SQLite file archiving finished matches, extract_event_details reads them back without an API call
+    ARCHIVE_PATH = None
+    #Metrics registry (metrics.py): request phase timings, payload sizes, decode and extraction times by league and endpoint
+    METRICS_ENABLED = True
+    #Also time DNS and connect of new connections, through urllib3 connection subclasses resolving hosts themselves
+    METRICS_CONNECTION_TIMINGS = False
+    #Optional exporter: 'prometheus' serves http://METRICS_HOST:METRICS_PORT/metrics, 'statsd' sends to STATSD_HOST:STATSD_PORT over UDP,
+    #the one run_poller.py worker processes can use
+    METRICS_EXPORTER = None
+    #Interface the Prometheus exporter listens on, '0.0.0.0' to expose it beyond this machine
+    METRICS_HOST = '127.0.0.1'
+    METRICS_PORT = 9108
+    STATSD_HOST = '127.0.0.1'
+    STATSD_PORT = 8125
+    STATSD_PREFIX = 'stats_com'
+    #Logging of the run scripts: LOG_FORMAT 'text' (message then key=value fields) or 'json' (one object per line)
+    LOG_LEVEL = 'INFO'
+    LOG_FORMAT = 'text'
+    #Fan-out server (run_fanout.py): listening address, updates kept per match for snapshots and
+    #Last-Event-ID catch up, and updates queued per subscriber before a slow one is disconnected
+    FANOUT_HOST = '127.0.0.1'
+    FANOUT_PORT = 8765
+    FANOUT_HISTORY = 100
+    FANOUT_QUEUE_SIZE = 256
+    #Worker processes of the long-lived poller (run_poller.py)
+    POLLER_WORKERS = 2
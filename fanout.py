@@ -0,0 +1,288 @@
+import asyncio
+import collections
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+from poller import LEAGUES, normalize
+import stream
+
+logger = logging.getLogger(__name__)
+
+#Comment line sent to idle subscribers so proxies keep the connection open
+HEARTBEAT_SECS = 15
+
+SSE_HEADERS = ('HTTP/1.1 200 OK\r\n'
+               'Content-Type: text/event-stream\r\n'
+               'Cache-Control: no-cache\r\n'
+               'Connection: keep-alive\r\n'
+               'Access-Control-Allow-Origin: *\r\n\r\n')
+
+
+def parse_events(value):
+    """Parse 'EPL:1913017,NFL:1744715' into (league, event id) pairs, raising ValueError on unknown leagues"""
+    events = []
+    for item in (value or '').split(','):
+        if not item:
+            continue
+        league_name, _, event_id = item.partition(':')
+        if league_name not in LEAGUES or not event_id:
+            raise ValueError('Expected LEAGUE:EVENT_ID with LEAGUE one of {0}, got {1}'.format(', '.join(sorted(LEAGUES)), item))
+        events.append((league_name, event_id))
+    return events
+
+
+def sse_message(update, sequence=None, kind=None):
+    """One Server-Sent Events message carrying an update as JSON"""
+    lines = []
+    if sequence is not None:
+        lines.append('id: {0}'.format(sequence))
+    lines.append('event: {0}'.format(kind or update['kind']))
+    lines.append('data: ' + json.dumps(update, sort_keys=True))
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+def poll_stream(live_stream):
+    """Poll the due events of a LiveStream
+    Returns:
+        tuple: (changes, errors, next_due) read together, on the thread owning the stream
+    """
+    changes = live_stream.poll_due()
+    errors = list(live_stream.errors)
+    del live_stream.errors[:]
+    return changes, errors, live_stream.scheduler.next_due()
+
+
+class MatchFeed:
+    """ Latest snapshot, recent updates and subscriber queues of one followed match"""
+    def __init__(self, league_name, event_id, history):
+        """
+        league_name (str): 'EPL' or 'NFL'
+        event_id (str): the stats.com event id
+        history (int): updates kept for snapshots and Last-Event-ID catch up
+        """
+        self.league_name = league_name
+        self.event_id = event_id
+        self.summary = None
+        self.updates = collections.deque(maxlen=history)
+        self.subscribers = set()
+        self.final = False
+        #Sequence of the newest update pushed out of the history, catching up from before it needs a snapshot
+        self.evicted = 0
+
+    def publish(self, sequence, update, queue_size):
+        """Record an update and hand it to every subscriber, dropping the ones too slow to keep up"""
+        if update['summary'] is not None:
+            self.summary = update['summary']
+            self.final = self.summary.get('event_status') == 'Post game'
+        if update['kind'] == stream.CANCELLED:
+            self.final = True
+        if len(self.updates) == self.updates.maxlen:
+            self.evicted = self.updates[0][0]
+        self.updates.append((sequence, update))
+        for queue in list(self.subscribers):
+            if queue.qsize() >= queue_size:
+                #The client reconnects with Last-Event-ID and catches up from the history
+                self.subscribers.discard(queue)
+                queue.put_nowait(None)
+            else:
+                queue.put_nowait((sequence, update))
+
+    def snapshot(self):
+        """Latest summary and the plays of the recent updates, what a late joiner needs to catch up"""
+        return {'league_name': self.league_name, 'event_id': self.event_id, 'kind': 'snapshot', 'summary': self.summary,
+                'plays': [update['play'] for _, update in self.updates if update['play'] is not None and update['kind'] != 'error'],
+                'sequence': self.updates[-1][0] if self.updates else None}
+
+    def since(self, sequence):
+        """Updates after sequence, None when the history no longer reaches back that far"""
+        if sequence < self.evicted:
+            return None
+        return [(update_sequence, update) for update_sequence, update in self.updates if update_sequence > sequence]
+
+
+class FanoutServer:
+    """ Asyncio Server-Sent Events server polling each followed match once for any number of subscribers
+
+    GET /stream?events=EPL:1913017,NFL:1744715 streams a snapshot of each match, then its updates
+    (the poller.normalize dicts) as they happen, until every match is over.
+    GET /snapshot?events=... returns the snapshots as JSON and GET /stats the feed and upstream counters.
+    """
+    def __init__(self, config, host=None, port=None):
+        """
+        config: object containing api_key, secret, endpoints and the FANOUT_* settings
+        host (str): interface to listen on, defaults to config.FANOUT_HOST
+        port (int): port to listen on, defaults to config.FANOUT_PORT
+        """
+        self.config = config
+        self.host = host or config.FANOUT_HOST
+        self.port = port if port is not None else config.FANOUT_PORT
+        self.streams = dict((league_name, request_class(config).stream([])) for league_name, request_class in LEAGUES.items())
+        #One thread per league: its LiveStream is only ever touched from that thread
+        self.executors = dict((league_name, ThreadPoolExecutor(max_workers=1)) for league_name in LEAGUES)
+        self.feeds = {}
+        self.sequence = 0
+        self.wake = None
+        self.server = None
+        self.pollers = []
+        #Set by close(), the league threads are shut down and unsubscribing subscribers must not use them
+        self.closing = False
+
+    async def start(self):
+        """Listen for subscribers and start polling, returns once the server is accepting connections"""
+        self.wake = dict((league_name, asyncio.Event()) for league_name in LEAGUES)
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.pollers = [asyncio.ensure_future(self.poll_league(league_name)) for league_name in LEAGUES]
+        logger.info('Fan-out server listening', extra={'host': self.host, 'port': self.port})
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        self.closing = True
+        for poller in self.pollers:
+            poller.cancel()
+        for feed in self.feeds.values():
+            for queue in feed.subscribers:
+                queue.put_nowait(None)
+        if self.server is not None:
+            self.server.close()
+        for league_name, executor in self.executors.items():
+            executor.shutdown(wait=False)
+            self.streams[league_name].request.transport.close()
+
+    async def _in_league_thread(self, league_name, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executors[league_name], function, *args)
+
+    async def poll_league(self, league_name):
+        """Poll the due matches of a league and publish their changes, for as long as the server runs"""
+        live_stream = self.streams[league_name]
+        wake = self.wake[league_name]
+        while True:
+            wake.clear()
+            changes, errors, next_due = await self._in_league_thread(league_name, poll_stream, live_stream)
+            for change in changes:
+                self.publish(league_name, change.event_id, normalize(league_name, change))
+            for event_id, error in errors:
+                self.publish(league_name, event_id, {'league_name': league_name, 'event_id': event_id, 'kind': 'error', 'summary': None, 'play': repr(error)})
+            #Sleep until the next match is due, or a newly followed match wakes the loop up
+            delay = None if next_due is None else max(0.0, next_due - time.time())
+            try:
+                await asyncio.wait_for(wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def publish(self, league_name, event_id, update):
+        feed = self.feeds.get((league_name, event_id))
+        if feed is None:
+            return
+        self.sequence += 1
+        feed.publish(self.sequence, update, self.config.FANOUT_QUEUE_SIZE)
+
+    async def follow(self, league_name, event_id):
+        """The feed of a match, following it upstream if nobody was"""
+        key = (league_name, event_id)
+        feed = self.feeds.get(key)
+        if feed is None:
+            feed = self.feeds[key] = MatchFeed(league_name, event_id, self.config.FANOUT_HISTORY)
+            await self._in_league_thread(league_name, self.streams[league_name].follow, event_id)
+            self.wake[league_name].set()
+        return feed
+
+    async def unsubscribe(self, feed, queue):
+        """Drop a subscriber, and stop following its match when it was the last one"""
+        feed.subscribers.discard(queue)
+        if self.closing:
+            return
+        if not feed.subscribers and self.feeds.get((feed.league_name, feed.event_id)) is feed:
+            del self.feeds[(feed.league_name, feed.event_id)]
+            await self._in_league_thread(feed.league_name, self.streams[feed.league_name].unfollow, feed.event_id)
+
+    async def handle(self, reader, writer):
+        """Serve one HTTP connection"""
+        try:
+            request_line = await reader.readline()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            method, _, rest = request_line.decode('latin-1').partition(' ')
+            url = urlparse(rest.rsplit(' ', 1)[0])
+            query = parse_qs(url.query)
+            try:
+                events = parse_events(query.get('events', [''])[0])
+            except ValueError as error:
+                return await self.respond(writer, 400, {'error': str(error)})
+            if method != 'GET':
+                return await self.respond(writer, 405, {'error': 'Only GET is supported'})
+            if url.path == '/stream' and events:
+                return await self.stream(writer, events, headers.get('last-event-id'))
+            if url.path == '/snapshot' and events:
+                feeds = [self.feeds.get(event) for event in events]
+                return await self.respond(writer, 200, [feed.snapshot() if feed is not None else None for feed in feeds])
+            if url.path == '/stats':
+                return await self.respond(writer, 200, self.stats())
+            return await self.respond(writer, 404, {'error': 'Use /stream?events=LEAGUE:EVENT_ID,... /snapshot?events=... or /stats'})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, body):
+        data = json.dumps(body, sort_keys=True).encode('utf-8')
+        reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}[status]
+        writer.write('HTTP/1.1 {0} {1}\r\nContent-Type: application/json\r\nContent-Length: {2}\r\nConnection: close\r\n\r\n'.format(status, reason, len(data)).encode('latin-1') + data)
+        await writer.drain()
+
+    async def stream(self, writer, events, last_event_id=None):
+        """Send a snapshot of each match, or the updates missed since Last-Event-ID, then the live updates"""
+        queue = asyncio.Queue()
+        feeds = []
+        for league_name, event_id in events:
+            feed = await self.follow(league_name, event_id)
+            feed.subscribers.add(queue)
+            feeds.append(feed)
+        try:
+            writer.write(SSE_HEADERS.encode('latin-1'))
+            #An id from before a server restart is ahead of this server's sequence, its history is gone
+            resume = last_event_id and last_event_id.isdigit() and int(last_event_id) <= self.sequence
+            for feed in feeds:
+                missed = feed.since(int(last_event_id)) if resume else None
+                if missed is None:
+                    writer.write(sse_message(feed.snapshot(), kind='snapshot'))
+                else:
+                    for sequence, update in missed:
+                        writer.write(sse_message(update, sequence))
+            await writer.drain()
+            #A poll queues its whole batch at once, the update making a match final is followed by that
+            #poll's goals and last play: only stop once they have all been written
+            while not (all(feed.final for feed in feeds) and queue.empty()):
+                try:
+                    item = await asyncio.wait_for(queue.get(), HEARTBEAT_SECS)
+                except asyncio.TimeoutError:
+                    writer.write(b': keep-alive\n\n')
+                    await writer.drain()
+                    continue
+                if item is None:
+                    break
+                writer.write(sse_message(item[1], item[0]))
+                await writer.drain()
+        finally:
+            for feed in feeds:
+                await self.unsubscribe(feed, queue)
+
+    def stats(self):
+        """Followed matches, subscribers and upstream requests, the cost of the fan-out"""
+        return {'matches': len(self.feeds), 'subscribers': sum(len(feed.subscribers) for feed in self.feeds.values()),
+                'updates_published': self.sequence,
+                'upstream_requests': dict((league_name, live_stream.scheduler.requests_made) for league_name, live_stream in self.streams.items()),
+                'requests_saved': dict((league_name, live_stream.scheduler.requests_saved) for league_name, live_stream in self.streams.items())}
@@ -0,0 +1,47 @@
+import json
+import logging
+import time
+
+
+#Attributes every LogRecord has, anything else was passed through extra= and is a structured field
+RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None)).keys()) | {'message', 'asctime'}
+
+
+def fields(record):
+    """The structured fields a log call passed through extra="""
+    return dict((key, value) for key, value in vars(record).items() if key not in RECORD_ATTRIBUTES)
+
+
+class JSONFormatter(logging.Formatter):
+    """ One JSON object per line: time, level, logger, message and the extra fields"""
+    def format(self, record):
+        entry = {'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + '.{0:03d}Z'.format(int(record.msecs)),
+                 'level': record.levelname, 'logger': record.name, 'message': record.getMessage()}
+        entry.update(fields(record))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class KeyValueFormatter(logging.Formatter):
+    """ Human readable line: time, level, logger and message followed by the extra fields as key=value"""
+    def __init__(self):
+        logging.Formatter.__init__(self, '%(asctime)s %(levelname)s %(name)s %(message)s')
+
+    def format(self, record):
+        line = logging.Formatter.format(self, record)
+        extra = fields(record)
+        if extra:
+            line += ' ' + ' '.join('{0}={1}'.format(key, extra[key]) for key in sorted(extra))
+        return line
+
+
+def configure_logging(config):
+    """Send the library logs to stderr in the config.LOG_FORMAT format at config.LOG_LEVEL"""
+    handler = logging.StreamHandler()
+    handler.setFormatter(JSONFormatter() if config.LOG_FORMAT == 'json' else KeyValueFormatter())
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(config.LOG_LEVEL)
+    #urllib3 debug lines carry the signed urls, api key included
+    logging.getLogger('urllib3').setLevel(logging.WARNING)
@@ -0,0 +1,277 @@
+import bisect
+import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+#Histogram bucket upper bounds, in seconds and in bytes
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+#Metrics recorded by Transport and StatsRequest, labelled by league and endpoint
+DESCRIPTIONS = {
+    'http_dns_seconds': 'DNS resolution of new upstream connections',
+    'http_connect_seconds': 'TCP connect and TLS handshake of new upstream connections',
+    'http_ttfb_seconds': 'Time from sending a request to its response headers',
+    'http_download_seconds': 'Time reading the response body',
+    'http_response_bytes': 'Decompressed response body size',
+    'http_wire_bytes': 'Response body size as transferred',
+    'json_decode_seconds': 'Decoding a response body',
+    'extract_seconds': 'Summarizing a decoded response',
+    'requests_total': 'Requests by outcome: response status code, cache or error',
+}
+
+_local = threading.local()
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def start_timing():
+    """Start collecting the connection timings of the request about to be sent on this thread"""
+    _local.timings = {}
+    return _local.timings
+
+
+def record_timing(name, seconds):
+    """Add a timing to the request in flight on this thread, no-op outside one"""
+    timings = getattr(_local, 'timings', None)
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+def current_timing(name):
+    timings = getattr(_local, 'timings', None)
+    return timings.get(name, 0.0) if timings else 0.0
+
+
+def stop_timing():
+    timings = getattr(_local, 'timings', None)
+    _local.timings = None
+    return timings or {}
+
+
+class Histogram:
+    """ Cumulative bucket counts, sum and count of observed values, Prometheus style"""
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """(upper bound, observations at or below it) pairs, ending with +Inf"""
+        total, pairs = 0, []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q quantile, an estimate like Prometheus histogram_quantile"""
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank and total:
+                return bound
+        return None
+
+
+class MetricsRegistry:
+    """ Histograms and counters keyed by metric name and labels, with listeners receiving every observation"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.listeners = []
+
+    def observe(self, name, value, buckets=SECONDS_BUCKETS, **labels):
+        """Record a value in the histogram of name and labels, eg: observe('json_decode_seconds', 0.004, league='EPL')"""
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+        for listener in self.listeners:
+            listener('histogram', name, value, labels)
+
+    def increment(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+        for listener in self.listeners:
+            listener('counter', name, value, labels)
+
+    def subscribe(self, listener):
+        """Call listener(kind, name, value, labels) on every observation, kind being 'histogram' or 'counter'"""
+        self.listeners.append(listener)
+        return listener
+
+    def snapshot(self):
+        """Summary of every metric: count, sum, mean and p50 / p95 / p99 estimates for histograms
+        Returns:
+            dict: 'name{label="value",...}' to summary dict for histograms, to value for counters
+        """
+        with self.lock:
+            report = {}
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                report[name + format_labels(labels)] = {
+                    'count': histogram.count, 'sum': histogram.sum,
+                    'mean': histogram.sum / histogram.count if histogram.count else None,
+                    'p50': histogram.quantile(0.5), 'p95': histogram.quantile(0.95), 'p99': histogram.quantile(0.99)}
+            for (name, labels), value in sorted(self.counters.items()):
+                report[name + format_labels(labels)] = value
+            return report
+
+    def to_prometheus(self):
+        """Every metric in the Prometheus text exposition format"""
+        lines, described = [], set()
+        with self.lock:
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                if name not in described:
+                    described.add(name)
+                    lines.append('# HELP {0} {1}'.format(name, DESCRIPTIONS.get(name, name)))
+                    lines.append('# TYPE {0} histogram'.format(name))
+                for bound, total in histogram.cumulative():
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append('{0}_bucket{1} {2}'.format(name, format_labels(labels + (('le', le),)), total))
+                lines.append('{0}_sum{1} {2!r}'.format(name, format_labels(labels), histogram.sum))
+                lines.append('{0}_count{1} {2}'.format(name, format_labels(labels), histogram.count))
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in described:
+                    described.add(name)
+                    lines.append('# HELP {0} {1}'.format(name, DESCRIPTIONS.get(name, name)))
+                    lines.append('# TYPE {0} counter'.format(name))
+                lines.append('{0}{1} {2}'.format(name, format_labels(labels), value))
+        return '\n'.join(lines) + '\n'
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join('{0}="{1}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"')) for key, value in labels) + '}'
+
+
+#Registry shared by every Transport of the process
+REGISTRY = MetricsRegistry()
+
+
+class PrometheusExporter:
+    """ Serves the registry in the Prometheus text format on http://host:port/metrics from a daemon thread"""
+    def __init__(self, registry, port, host='127.0.0.1'):
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = registry.to_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class StatsDExporter:
+    """ Sends every observation to a StatsD collector over UDP, labels joined into the metric name"""
+    def __init__(self, registry, host, port, prefix=''):
+        """
+        registry (MetricsRegistry): registry whose observations are sent
+        host (str): StatsD collector host
+        port (int): StatsD collector UDP port
+        prefix (str): prepended to every metric name, eg: 'stats_com'
+        """
+        self.address = (host, port)
+        self.prefix = prefix + '.' if prefix else ''
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.registry = registry
+        registry.subscribe(self.send)
+
+    def line(self, kind, name, value, labels):
+        """StatsD line of an observation, eg: stats_com.json_decode.event.EPL:4.100|ms"""
+        timer = kind == 'histogram' and name.endswith('_seconds')
+        if timer:
+            name = name[:-len('_seconds')]
+        path = self.prefix + '.'.join([name] + [str(labels[key]) for key in sorted(labels)])
+        if kind == 'counter':
+            return '{0}:{1}|c'.format(path, value)
+        if timer:
+            return '{0}:{1:.3f}|ms'.format(path, value * 1000)
+        return '{0}:{1}|h'.format(path, value)
+
+    def send(self, kind, name, value, labels):
+        try:
+            self.socket.sendto(self.line(kind, name, value, labels).encode('utf-8'), self.address)
+        except OSError:
+            #Metrics must never fail a request
+            pass
+
+    def close(self):
+        if self.send in self.registry.listeners:
+            self.registry.listeners.remove(self.send)
+        self.socket.close()
+
+
+def start_exporter(config, registry=REGISTRY):
+    """Start the exporter chosen by config.METRICS_EXPORTER once per process
+    Args:
+        config: object containing the METRICS_* and STATSD_* settings
+        registry (MetricsRegistry): registry to export, the process-wide one by default
+    Returns:
+        PrometheusExporter or StatsDExporter, None when METRICS_EXPORTER is not set
+    """
+    global _exporter
+    with _exporter_lock:
+        #A forked worker process gets a copy of its parent's exporter, it needs its own
+        if _exporter is not None and _exporter[0] == os.getpid():
+            return _exporter[1]
+        if _exporter is not None and isinstance(_exporter[1], StatsDExporter):
+            _exporter[1].close()
+        if config.METRICS_EXPORTER == 'prometheus':
+            exporter = PrometheusExporter(registry, config.METRICS_PORT, config.METRICS_HOST)
+        elif config.METRICS_EXPORTER == 'statsd':
+            exporter = StatsDExporter(registry, config.STATSD_HOST, config.STATSD_PORT, config.STATSD_PREFIX)
+        elif config.METRICS_EXPORTER:
+            raise ValueError("METRICS_EXPORTER must be 'prometheus', 'statsd' or None")
+        else:
+            return None
+        _exporter = (os.getpid(), exporter)
+        return exporter
+
+
+class Stopwatch:
+    """ Context manager timing a block into a registry histogram, a no-op without a registry"""
+    __slots__ = ('registry', 'name', 'labels', 'started')
+
+    def __init__(self, registry, name, **labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.registry is not None:
+            self.registry.observe(self.name, time.perf_counter() - self.started, **self.labels)
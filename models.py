@@ -0,0 +1,48 @@
+import json
+
+
+class Summary:
+    """ Compact result object, fields are declared in __slots__ by each subclass"""
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.pop(name, None))
+        if fields:
+            raise TypeError('{0} got unexpected fields: {1}'.format(type(self).__name__, ', '.join(sorted(fields))))
+
+    def to_dict(self):
+        """Plain dict of the fields, leaving out the ones the league does not report (None)"""
+        return dict((name, getattr(self, name)) for name in self.__slots__ if getattr(self, name) is not None)
+
+    def to_json(self, indent=4):
+        """Serialize the fields like the former string API, with the keys it did not have added
+        EventSummary adds epoch_start_time in both leagues and event_status in NFL.
+        """
+        return json.dumps(self.to_dict(), sort_keys=True, indent=indent)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return '{0}({1})'.format(type(self).__name__, ', '.join('{0}={1!r}'.format(name, value) for name, value in self.to_dict().items()))
+
+
+class MatchSummary(Summary):
+    """ One scheduled match returned by get_events"""
+    __slots__ = ('event_id', 'start_time_utc', 'home_team_name', 'away_team_name')
+
+
+class EventSummary(Summary):
+    """ Current state of a match returned by extract_event_details
+    home_score_before and away_score_before are only reported by leagues whose plays carry them (NFL)
+    """
+    __slots__ = ('league_name', 'event_id', 'event_status', 'start_time_utc', 'epoch_start_time',
+                 'current_period', 'current_time', 'home_team_name', 'away_team_name',
+                 'home_score_before', 'away_score_before', 'home_score_after', 'away_score_after',
+                 'last_pbp_event_name', 'last_pbp_event_id', 'player_name', 'venue_name', 'venue_city')
+
+
+def summaries_to_json(summaries, indent=4):
+    """Serialize a list of summaries, eg: the get_events result"""
+    return json.dumps([summary.to_dict() for summary in summaries], sort_keys=True, indent=indent)
@@ -0,0 +1,149 @@
+import multiprocessing
+import queue
+import signal
+import time
+from stats_epl import EPLRequest
+from stats_nfl import NFLRequest
+from logs import configure_logging
+import metrics
+
+
+LEAGUES = {'EPL': EPLRequest, 'NFL': NFLRequest}
+
+#Put on the update queue by a worker once all of its events are over or it was stopped
+WORKER_DONE = 'worker_done'
+
+
+def normalize(league_name, change):
+    """Plain picklable dict for a stream.ChangeEvent, the form updates take on the queue"""
+    return {'league_name': league_name, 'event_id': change.event_id, 'kind': change.kind,
+            'summary': change.summary.to_dict() if change.summary is not None else None,
+            'play': change.play}
+
+
+def partition(events, workers):
+    """Spread (league, event id) pairs round-robin over the workers
+    Returns:
+        list: one list of (league, event id) pairs per worker, empty workers left out
+    """
+    assignments = [[] for _ in range(workers)]
+    for index, event in enumerate(events):
+        assignments[index % workers].append(event)
+    return [assignment for assignment in assignments if assignment]
+
+
+def worker_config(config, workers):
+    """Config of one of several worker processes, given an even share of the API key rate limit
+    The rate limiter only covers its own process, workers each drawing the full rate would multiply the quota.
+    Args:
+        config: Config class the poller was started with
+        workers (int): number of worker processes sharing the API key
+    Returns:
+        Config subclass with RATE_LIMIT_PER_SEC and RATE_LIMIT_BURST divided by workers
+    """
+    if not config.RATE_LIMIT_PER_SEC or workers <= 1:
+        return config
+    return type(config.__name__, (config,), {'RATE_LIMIT_PER_SEC': float(config.RATE_LIMIT_PER_SEC) / workers,
+                                             'RATE_LIMIT_BURST': max(1, config.RATE_LIMIT_BURST // workers)})
+
+
+def run_worker(config, assignment, updates, stop, workers=1):
+    """Worker process entry point: stream the assigned events and send normalized updates
+    Each worker builds its own request objects and so its own pooled connections and rate limiter.
+    Args:
+        config: object containing api_key, secret and endpoints
+        assignment (list): (league, event id) pairs to follow
+        updates (multiprocessing.Queue): where the normalized updates are sent
+        stop (multiprocessing.Event): set by the parent to shut the worker down
+        workers (int): number of worker processes the rate limit is split between
+    """
+    #The parent process handles Ctrl-C and shuts the workers down through stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    config = worker_config(config, workers)
+    configure_logging(config)
+    #Only a push exporter works from several processes, each worker would need its own Prometheus port
+    if config.METRICS_EXPORTER == 'statsd':
+        metrics.start_exporter(config)
+    streams = {}
+    for league_name, event_id in assignment:
+        streams.setdefault(league_name, []).append(event_id)
+    streams = dict((league_name, LEAGUES[league_name](config).stream(event_ids)) for league_name, event_ids in streams.items())
+    try:
+        while not stop.is_set() and not all(live_stream.done() for live_stream in streams.values()):
+            for league_name, live_stream in streams.items():
+                for change in live_stream.poll_due():
+                    updates.put(normalize(league_name, change))
+                for event_id, error in live_stream.errors:
+                    updates.put({'league_name': league_name, 'event_id': event_id, 'kind': 'error', 'summary': None, 'play': repr(error)})
+                del live_stream.errors[:]
+            next_due = min([live_stream.scheduler.next_due() for live_stream in streams.values() if not live_stream.done()] or [time.time()])
+            stop.wait(max(0, next_due - time.time()))
+    finally:
+        for live_stream in streams.values():
+            live_stream.request.transport.close()
+        updates.put(WORKER_DONE)
+
+
+class Poller:
+    """ Long-lived poller spreading live EPL and NFL events over a pool of worker processes"""
+    def __init__(self, config, events, workers=None):
+        """
+        config: object containing api_key, secret and endpoints
+        events (iterable): (league, event id) pairs, league being 'EPL' or 'NFL'
+        workers (int): number of worker processes, defaults to config.POLLER_WORKERS
+        """
+        self.config = config
+        self.events = list(events)
+        for league_name, event_id in self.events:
+            if league_name not in LEAGUES:
+                raise ValueError('Unknown league {0}, expected one of {1}'.format(league_name, ', '.join(sorted(LEAGUES))))
+        self.workers = workers or config.POLLER_WORKERS
+        self.updates_queue = multiprocessing.Queue()
+        self.stop_event = multiprocessing.Event()
+        self.processes = []
+
+    def start(self):
+        """Start one process per non-empty share of the events, splitting the rate limit between them"""
+        assignments = partition(self.events, self.workers)
+        for assignment in assignments:
+            process = multiprocessing.Process(target=run_worker, args=(self.config, assignment, self.updates_queue, self.stop_event, len(assignments)))
+            process.daemon = True
+            process.start()
+            self.processes.append(process)
+
+    def updates(self):
+        """Yield normalized update dicts until every worker is done"""
+        running = len(self.processes)
+        while running:
+            try:
+                update = self.updates_queue.get(timeout=1)
+            except queue.Empty:
+                if not any(process.is_alive() for process in self.processes):
+                    return
+                continue
+            if update == WORKER_DONE:
+                running -= 1
+            else:
+                yield update
+
+    def stop(self, timeout=10):
+        """Ask the workers to finish their current poll and exit, terminating any still running after timeout
+        Returns:
+            list: updates the workers sent while shutting down
+        """
+        self.stop_event.set()
+        deadline = time.time() + timeout
+        remaining = []
+        #Keep draining the queue, a worker cannot exit while its queued updates are unread
+        while any(process.is_alive() for process in self.processes) and time.time() < deadline:
+            try:
+                update = self.updates_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if update != WORKER_DONE:
+                remaining.append(update)
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        return remaining
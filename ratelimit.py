@@ -0,0 +1,117 @@
+import email.utils
+import heapq
+import itertools
+import os
+import threading
+import time
+
+
+#Request priorities, lower is served first
+PRIORITY_LIVE = 0
+PRIORITY_SCHEDULE = 1
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def retry_after_seconds(value, default):
+    """Seconds to wait from a Retry-After header, given either in seconds or as an HTTP date"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class RateLimiter:
+    """ Token bucket for one API key, granting tokens to waiting requests in priority order"""
+    def __init__(self, rate, burst, daily_budget=None):
+        """
+        rate (float): tokens added per second
+        burst (int): bucket size, the most requests sent back to back
+        daily_budget (int): optional requests allowed per UTC day, reported by usage()
+        """
+        self.rate = rate
+        self.burst = burst
+        self.daily_budget = daily_budget
+        self.tokens = float(burst)
+        self.updated = time.time()
+        self.paused_until = 0.0
+        self.condition = threading.Condition()
+        self.waiting = []
+        self.tickets = itertools.count()
+        self.granted = dict()
+        self.waited_secs = 0.0
+        self.rate_limited = 0
+        self.day = None
+        self.used_today = 0
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, priority=PRIORITY_LIVE):
+        """Block until this request may be sent, higher priority waiters going first"""
+        started = time.time()
+        with self.condition:
+            ticket = (priority, next(self.tickets))
+            heapq.heappush(self.waiting, ticket)
+            while True:
+                now = time.time()
+                self._refill(now)
+                if self.waiting[0] == ticket and self.tokens >= 1 and now >= self.paused_until:
+                    break
+                if self.waiting[0] == ticket:
+                    wait = max(self.paused_until - now, (1 - self.tokens) / self.rate, 0.001)
+                else:
+                    wait = None
+                self.condition.wait(wait)
+            heapq.heappop(self.waiting)
+            self.tokens -= 1
+            self.granted[priority] = self.granted.get(priority, 0) + 1
+            self.waited_secs += now - started
+            today = time.strftime('%Y-%m-%d', time.gmtime(now))
+            if today != self.day:
+                self.day, self.used_today = today, 0
+            self.used_today += 1
+            #Let the next waiter re-check the head of the queue
+            self.condition.notify_all()
+
+    def pause(self, seconds):
+        """Stop granting tokens for seconds, after the API answered 429 Too Many Requests"""
+        with self.condition:
+            self.rate_limited += 1
+            self.paused_until = max(self.paused_until, time.time() + seconds)
+            self.tokens = 0.0
+            self.condition.notify_all()
+
+    def usage(self):
+        """Budget report: requests granted by priority, time spent waiting, 429s and today's usage"""
+        with self.condition:
+            report = {'granted': dict(self.granted), 'waited_secs': round(self.waited_secs, 3),
+                      'rate_limited': self.rate_limited, 'waiting': len(self.waiting),
+                      'used_today': self.used_today}
+            if self.daily_budget is not None:
+                report['remaining_today'] = max(0, self.daily_budget - self.used_today)
+            return report
+
+
+def limiter_for(config):
+    """The process-wide RateLimiter of config.API_KEY, None when RATE_LIMIT_PER_SEC is not set
+    Every request object and transport built from the same key shares one bucket, within one process only:
+    processes polling with the same key must split the rate between them, see poller.worker_config.
+    """
+    if not config.RATE_LIMIT_PER_SEC:
+        return None
+    with _limiters_lock:
+        limiter = _limiters.get(config.API_KEY)
+        #A forked worker process gets a copy of its parent's limiters, it needs its own bucket
+        if limiter is None or limiter[0] != os.getpid():
+            limiter = (os.getpid(), RateLimiter(config.RATE_LIMIT_PER_SEC, config.RATE_LIMIT_BURST, config.RATE_LIMIT_DAILY_BUDGET))
+            _limiters[config.API_KEY] = limiter
+        return limiter[1]
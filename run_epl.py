@@ -1,16 +1,21 @@
 from stats_epl import EPLRequest
 from config import Config
+from logs import configure_logging
+import metrics
+
+configure_logging(Config)
+metrics.start_exporter(Config)
 
 #Instantiate an EPL Class
 EPL = EPLRequest(Config)
 
 start_date = '2017-08-21'
 end_date = '2017-08-27'
-events_json = EPL.get_events(start_date, end_date)
+events_json = EPL.get_events(start_date, end_date, as_json=True)
 
 #Enter stats.com event id for an on-going/completed EPL match
 epl_event_id = '1913017'
-specific_events_json = EPL.extract_event_details(epl_event_id)
+specific_events_json = EPL.extract_event_details(epl_event_id, as_json=True)
 
 print(events_json)
 print(specific_events_json)
\ No newline at end of file
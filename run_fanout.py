@@ -0,0 +1,20 @@
+import argparse
+import asyncio
+from fanout import FanoutServer
+from config import Config
+from logs import configure_logging
+import metrics
+
+#Serve live matches to many subscribers from one poll per match, eg: python run_fanout.py --port 8765
+#then: curl -N 'http://127.0.0.1:8765/stream?events=EPL:1913017,NFL:1744715'
+parser = argparse.ArgumentParser(description='Server-Sent Events fan-out of live EPL and NFL matches')
+parser.add_argument('--host', default=None, help='interface to listen on, defaults to Config.FANOUT_HOST')
+parser.add_argument('--port', type=int, default=None, help='port to listen on, defaults to Config.FANOUT_PORT')
+args = parser.parse_args()
+configure_logging(Config)
+metrics.start_exporter(Config)
+
+try:
+    asyncio.run(FanoutServer(Config, args.host, args.port).serve_forever())
+except KeyboardInterrupt:
+    pass
@@ -1,16 +1,21 @@
 from stats_nfl import NFLRequest
 from config import Config
+from logs import configure_logging
+import metrics
+
+configure_logging(Config)
+metrics.start_exporter(Config)
 
 #Instantiate an EPL Class
 NFL = NFLRequest(Config)
 
 start_date = '2017-08-21'
 end_date = '2017-08-27'
-events_json = NFL.get_events(start_date, end_date)
+events_json = NFL.get_events(start_date, end_date, as_json=True)
 
 #Enter stats.com event id for an on-going/completed NFL match
 nfl_event_id = '1744715'
-specific_events_json = NFL.extract_event_details('1744715')
+specific_events_json = NFL.extract_event_details(nfl_event_id, as_json=True)
 
 print(events_json)
 print(specific_events_json)
\ No newline at end of file
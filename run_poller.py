@@ -0,0 +1,30 @@
+import argparse
+import json
+import signal
+from poller import Poller
+from config import Config
+from logs import configure_logging
+
+#Follow live matches, eg: python run_poller.py EPL:1913017 NFL:1744715 --workers 2
+parser = argparse.ArgumentParser(description='Poll live EPL and NFL matches over a pool of worker processes')
+parser.add_argument('events', nargs='+', help='LEAGUE:EVENT_ID, eg: EPL:1913017')
+parser.add_argument('--workers', type=int, default=None, help='worker processes, defaults to Config.POLLER_WORKERS')
+args = parser.parse_args()
+configure_logging(Config)
+
+events = [tuple(event.split(':', 1)) for event in args.events]
+poller = Poller(Config, events, args.workers)
+
+def shutdown(signum, frame):
+    raise KeyboardInterrupt
+
+signal.signal(signal.SIGTERM, shutdown)
+poller.start()
+try:
+    for update in poller.updates():
+        print(json.dumps(update, sort_keys=True))
+except KeyboardInterrupt:
+    pass
+finally:
+    for update in poller.stop():
+        print(json.dumps(update, sort_keys=True))
@@ -0,0 +1,125 @@
+import calendar
+import datetime
+import time
+
+
+#Match phases returned by the league poll_phase methods
+LIVE = 'live'
+CLOSING = 'closing'
+BREAK = 'break'
+FINAL = 'final'
+
+
+def epoch_from_utc(start_time_utc):
+    """Convert a stats.com UTC start time (YYYY-MM-DDTHH:MM:SS) to epoch seconds"""
+    start_stats_timestamp = datetime.datetime.strptime(start_time_utc, "%Y-%m-%dT%H:%M:%S")
+    return calendar.timegm(start_stats_timestamp.utctimetuple())
+
+
+class PollScheduler:
+    """ Decides when each event next needs polling from its status, start time and match clock"""
+    def __init__(self, request, interval=None, closing_interval=None, max_interval=None):
+        """
+        request: EPLRequest or NFLRequest providing the league poll_phase rules
+        interval (float): seconds between polls of a live match, defaults to config.POLL_INTERVAL
+        closing_interval (float): seconds between polls in the closing minutes, defaults to config.POLL_CLOSING_INTERVAL
+        max_interval (float): ceiling a quiet live match backs off to, defaults to config.POLL_MAX_INTERVAL
+        """
+        self.request = request
+        self.interval = interval or request.config.POLL_INTERVAL
+        self.closing_interval = closing_interval or min(request.config.POLL_CLOSING_INTERVAL, self.interval)
+        self.max_interval = max_interval or max(request.config.POLL_MAX_INTERVAL, self.interval)
+        self.next_poll = {}
+        self.start_times = {}
+        self.intervals = {}
+        self.break_started = {}
+        self.requests_made = 0
+        #Polls avoided compared with polling every event at the fixed interval
+        self.saved = 0.0
+
+    @property
+    def requests_saved(self):
+        return int(self.saved)
+
+    def add(self, event_id, start_time_utc=None, now=None):
+        """Start scheduling an event, due immediately
+        Args:
+            event_id (str): the stats.com event id.
+            start_time_utc (str, iso format): kickoff time, lets the scheduler sleep until the match starts.
+        """
+        if start_time_utc:
+            self.start_times[event_id] = epoch_from_utc(start_time_utc)
+        self.intervals[event_id] = self.interval
+        self.next_poll[event_id] = now if now is not None else time.time()
+
+    def set_start_time(self, event_id, start_time_utc):
+        """Record the kickoff of an event, read from its payload before the match has begun"""
+        self.start_times[event_id] = epoch_from_utc(start_time_utc)
+
+    def remove(self, event_id):
+        """Stop scheduling an event"""
+        self.next_poll.pop(event_id, None)
+        self.start_times.pop(event_id, None)
+        self.intervals.pop(event_id, None)
+        self.break_started.pop(event_id, None)
+
+    def __len__(self):
+        return len(self.next_poll)
+
+    def __contains__(self, event_id):
+        return event_id in self.next_poll
+
+    def due(self, now=None):
+        """List the event ids whose next poll time has passed"""
+        now = now if now is not None else time.time()
+        return [event_id for event_id, due in self.next_poll.items() if due <= now]
+
+    def next_due(self):
+        """Epoch seconds of the earliest scheduled poll, or None when nothing is scheduled"""
+        return min(self.next_poll.values()) if self.next_poll else None
+
+    def update(self, event_id, summary, changed=True, now=None):
+        """Record a poll of an event and schedule the next one
+        Args:
+            event_id (str): the stats.com event id that was polled.
+            summary (EventSummary or str): summarize_event result, a str when the match has not begun.
+            changed (bool): whether the poll produced any change, quiet live matches back off.
+        Returns:
+            float: epoch seconds of the next poll, or None once the match is over and unscheduled
+        """
+        now = now if now is not None else time.time()
+        self.requests_made += 1
+        if isinstance(summary, str):
+            delay = self._pre_kickoff_delay(event_id, now)
+        else:
+            if summary.epoch_start_time:
+                self.start_times[event_id] = summary.epoch_start_time
+            phase, break_mins = self.request.poll_phase(summary)
+            if phase == FINAL:
+                self.remove(event_id)
+                return None
+            delay = self._phase_delay(event_id, phase, break_mins, changed, now)
+        self.saved += delay / self.interval - 1
+        self.next_poll[event_id] = now + delay
+        return self.next_poll[event_id]
+
+    def _pre_kickoff_delay(self, event_id, now):
+        start = self.start_times.get(event_id)
+        if start is None or start <= now:
+            #Unknown kickoff, or late / postponed, check back occasionally
+            return self.max_interval
+        return max(self.interval, start - now)
+
+    def _phase_delay(self, event_id, phase, break_mins, changed, now):
+        if phase == BREAK:
+            started = self.break_started.setdefault(event_id, now)
+            #Sleep through the break, then poll at the live rate until play resumes
+            return max(self.interval, started + break_mins * 60 - now)
+        self.break_started.pop(event_id, None)
+        if phase == CLOSING:
+            self.intervals[event_id] = self.closing_interval
+        elif changed:
+            self.intervals[event_id] = self.interval
+        else:
+            self.intervals[event_id] = min(max(self.intervals[event_id], self.interval) * 1.5, self.max_interval)
+        return self.intervals[event_id]
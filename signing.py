@@ -0,0 +1,86 @@
+import functools
+import hashlib
+import threading
+import time
+from urllib.parse import quote
+
+
+_signers = {}
+_signers_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=4096)
+def encode(value):
+    """Percent-encode a path segment or query value, memoized as the same event ids and dates repeat every poll"""
+    return quote(value, safe='')
+
+
+class Signer:
+    """ stats.com request signature, the SHA-256 of api key + secret + unix second, computed once per second"""
+    def __init__(self, api_key, secret, clock=time.time):
+        """
+        api_key (str): stats.com API key
+        secret (str): stats.com shared secret
+        clock (callable): returns the current unix time, time.time by default
+        """
+        self.api_key = api_key
+        self.secret = secret
+        self.clock = clock
+        self.computed = 0
+        #(second, signature) replaced as one tuple so threads never see a torn pair
+        self.current = (None, None)
+
+    def sign(self, second):
+        """Signature of one unix second, always computed"""
+        return hashlib.sha256((self.api_key + self.secret + str(second)).encode('utf-8')).hexdigest()
+
+    def sig(self):
+        """Signature of the current second, reused until the second changes"""
+        second = int(self.clock())
+        current = self.current
+        if current[0] != second:
+            current = (second, self.sign(second))
+            self.current = current
+            self.computed += 1
+        return current[1]
+
+
+def signer_for(config):
+    """The process-wide Signer of config.API_KEY, shared by every request object using the key"""
+    with _signers_lock:
+        signer = _signers.get((config.API_KEY, config.SECRET))
+        if signer is None:
+            signer = Signer(config.API_KEY, config.SECRET)
+            _signers[(config.API_KEY, config.SECRET)] = signer
+        return signer
+
+
+class URLTemplate:
+    """ Prebuilt url of one endpoint, only the encoded per request values and the signature are added to it"""
+    def __init__(self, base, signer, params=(), fixed_query=''):
+        """
+        base (str): api host and endpoint path, eg: 'http://api.stats.com/v1/stats/soccer/epl/matches/'
+        signer (Signer): signs each url
+        params (tuple): names of the query parameters given per request, in url order
+        fixed_query (str): encoded query parameters sent on every request, eg: 'pbp=true'
+        """
+        self.base = base
+        self.signer = signer
+        self.params = tuple(param + '=' for param in params)
+        self.tail = (fixed_query + '&' if fixed_query else '') + 'api_key=' + encode(signer.api_key) + '&sig='
+
+    def unsigned(self, path='', *values):
+        """The url without api key and signature, for logging"""
+        return self.base + encode(path) + '?' + ''.join([param + encode(value) + '&' for param, value in zip(self.params, values)])
+
+    def url(self, path='', *values):
+        """Signed url of a request
+        Args:
+            path (str): appended to the endpoint path and percent-encoded, eg: the event id
+            values (str): one value per template param, percent-encoded
+        Returns:
+            str: the url, signed for the current second
+        """
+        if not self.params:
+            return self.base + encode(path) + '?' + self.tail + self.signer.sig()
+        return self.unsigned(path, *values) + self.tail + self.signer.sig()
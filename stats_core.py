@@ -0,0 +1,292 @@
+import logging
+from transport import Transport
+from signing import URLTemplate, signer_for
+from models import MatchSummary, EventSummary, summaries_to_json
+import cache
+import stream
+import scheduler
+import ratelimit
+import metrics
+import backfill
+from archive import PlayArchive
+
+
+logger = logging.getLogger(__name__)
+
+
+def compile_path(path, default=""):
+    """Compile a field path into a getter walked without re-parsing the path
+    Args:
+        path (tuple): dict keys and list indexes to follow, eg: ('playEvent', 'name')
+        default: value returned when any step of the path is missing
+    Returns:
+        function: getter taking the root object and returning the field value
+    """
+    keys = tuple(path)
+
+    def get(obj):
+        for key in keys:
+            try:
+                obj = obj[key]
+            except (KeyError, IndexError, TypeError):
+                return default
+        return obj
+    return get
+
+
+class LeagueSchema:
+    """ Declarative description of where a league keeps its fields in the events API"""
+    def __init__(self, league_name, events_path_setting, events_key, play_id_field, play_fields):
+        """
+        league_name (str): League name reported in the summaries
+        events_path_setting (str): name of the config attribute holding the league events path
+        events_key (str): key of the event list under eventType, eg: 'matches' or 'events'
+        play_id_field (str): pbp field that orders the plays, eg: 'sequenceNumber' or 'playId'
+        play_fields (list): (EventSummary field, field path) pairs read from the last play
+        """
+        self.league_name = league_name
+        self.events_path_setting = events_path_setting
+        self.events_key = events_key
+        self.play_id_field = play_id_field
+        self.events = compile_path(('apiResults', 0, 'league', 'season', 'eventType', 0, events_key), [])
+        self.event_status_id = compile_path(('eventStatus', 'eventStatusId'))
+        self.play_id = compile_path((play_id_field,), 0)
+        self.play_fields = [(name, compile_path(path)) for name, path in play_fields]
+
+    def event(self, response):
+        """The first event object of an events API response"""
+        events = self.events(response)
+        return events[0] if events else None
+
+
+class StatsRequest:
+    """ Stats.com Request object shared by every league, configured by a LeagueSchema"""
+    schema = None
+
+    def __init__(self, config, transport=None, archive=None):
+        """
+        config: object containing api_key, secret and endpoints
+        transport: optional Transport to share a connection pool with other request objects
+        archive: optional PlayArchive, defaults to one at config.ARCHIVE_PATH when it is set
+        """
+        self.config = config
+        self.api_key = config.API_KEY
+        self.secret = config.SECRET
+        self.api_host = config.API_HOST
+        self.events_path = getattr(config, self.schema.events_path_setting)
+        self.signer = signer_for(config)
+        #One prebuilt url per endpoint: schedule, full event and light event
+        self.schedule_url = URLTemplate(self.api_host + self.events_path, self.signer, ('startDate', 'endDate'))
+        self.event_url = URLTemplate(self.api_host + self.events_path, self.signer, fixed_query='pbp=true')
+        self.event_light_url = URLTemplate(self.api_host + self.events_path, self.signer)
+        self.transport = transport if transport is not None else Transport(config)
+        self.metrics = self.transport.metrics
+        if archive is None and config.ARCHIVE_PATH:
+            archive = PlayArchive(config.ARCHIVE_PATH)
+        self.archive = archive
+
+    @property
+    def league_name(self):
+        return self.schema.league_name
+
+    @property
+    def events_key(self):
+        return self.schema.events_key
+
+    @property
+    def play_id_field(self):
+        return self.schema.play_id_field
+
+    def get_events(self, start_date, end_date, as_json=False):
+        """Get all events between a start data and end date
+        Args:
+            startDate (str): YYYYMMDD or YYYY-MM-DD
+            endDate (str): YYYYMMDD or YYYY-MM-DD
+            as_json (bool): return the list serialized as a JSON string instead of objects
+        Returns:
+            List of MatchSummary with following details:
+            - event_id (str): stats.com id of the event
+            - home_team_name (str)
+            - away_team_name (str)
+            - start_time_utc (str, iso format)
+        """
+        logger.info('Querying events', extra={'league': self.league_name, 'url': self.schedule_url.unsigned('', start_date, end_date)})
+        cache_key = self.events_path + '?startDate=' + start_date + '&endDate=' + end_date
+        labels = {'league': self.league_name, 'endpoint': 'schedule'}
+        response_json = self.transport.get_json(lambda: self.schedule_url.url('', start_date, end_date), cache_key,
+                                                cache.schedule_ttl(self.config, end_date), ratelimit.PRIORITY_SCHEDULE, labels)
+        if response_json is None:
+            return None
+
+        event_array = []
+        with metrics.Stopwatch(self.metrics, 'extract_seconds', **labels):
+            for event in self.schema.events(response_json):
+                home_team_name, away_team_name = self.team_names(event)
+                event_array.append(MatchSummary(event_id=event.get('eventId',""), start_time_utc=self.start_time_utc(event), home_team_name=home_team_name, away_team_name=away_team_name))
+        if as_json:
+            return summaries_to_json(event_array)
+        return event_array
+
+    def backfill_events(self, start_date, end_date, window_days=None, workers=None, state_path=None):
+        """Get all events of a long date range, such as a whole season, in concurrent windows
+        Args:
+            startDate (str): YYYYMMDD or YYYY-MM-DD
+            endDate (str): YYYYMMDD or YYYY-MM-DD
+            window_days (int): days per get_events request.
+            workers (int): windows fetched concurrently.
+            state_path (str): optional JSON file making the backfill resumable.
+        Returns:
+            backfill.ScheduleBackfill: iterator of MatchSummary, each event id once, as windows arrive
+        """
+        return backfill.ScheduleBackfill(self, start_date, end_date, window_days, workers, state_path)
+
+    def get_event_details(self, event_id, pbp=True):
+        """Query the Events API by event id
+        Args:
+            event_id (str): the stats.com event id.
+            pbp (bool): include the full play by play list, set False for the lighter payload
+        Returns:
+            dict: The JSON response from the request.
+        """
+        template = self.event_url if pbp else self.event_light_url
+        cache_key = self.events_path + event_id + ('?pbp=true' if pbp else '')
+        labels = {'league': self.league_name, 'endpoint': 'event' if pbp else 'event_light'}
+        return self.transport.get_json(lambda: template.url(event_id), cache_key,
+                                       cache.event_ttl(self.config, self.schema.event), ratelimit.PRIORITY_LIVE, labels)
+
+    def extract_event_details(self, event_id, as_json=False):
+        """Extracts current score, event, player involved from the json response
+        Finished matches are read from and saved to the archive, when there is one.
+        Args:
+            event_id (str): the stats.com event id.
+            as_json (bool): return the summary serialized as a JSON string instead of an object. It has the
+                keys of the former string API plus epoch_start_time, and event_status for NFL.
+        Returns:
+            EventSummary: see summarize_event, or a message (str) if the match could not be summarized
+        """
+        response = self.archive.load_response(self.league_name, event_id) if self.archive is not None else None
+        if response is None:
+            response = self.get_event_details(event_id)
+            if response == None:
+                return 'No response received, check event id'
+            if self.archive is not None and self.schema.event_status_id(self.schema.event(response) or {}) == 4:
+                self.archive.store(self, event_id, response)
+        with metrics.Stopwatch(self.metrics, 'extract_seconds', league=self.league_name, endpoint='event'):
+            event = self.schema.event(response)
+            if event is None:
+                return 'No response received, check event id'
+            summary = self.summarize_event(event, event_id)
+        if as_json and not isinstance(summary, str):
+            return summary.to_json()
+        return summary
+
+    def summarize_event(self, event, event_id):
+        """Extracts current score, event, player involved from a single event object
+        Args:
+            event (dict): the event object from an events API response.
+            event_id (str): the stats.com event id for the match.
+        Returns:
+            EventSummary: containing:
+                - league_name (str): League name
+                - event_id (str): Event Id
+                - event_status (str): Status of the match either "In Progress" or "Post game"
+                - start_time_utc (str, iso format): Start time of the match
+                - epoch_start_time (int): Start time of the match in epoch seconds
+                - home_team_name (str): Home team name
+                - away_team_name (str): Away team name
+                - player_name (str): Player involved in last play by play event
+                - venue_name (str): Match venue name
+                - venue_city (str): Match venue city
+                - the schema play fields read from the last play by play event, such as
+                  current_period, current_time, scores and last_pbp_event_name / last_pbp_event_id
+            or a message (str) if the match has not begun or has been postponed / cancelled
+        """
+        #Get current game status
+        event_status_id = self.schema.event_status_id(event)
+        if event_status_id != 2 and event_status_id != 4:
+            return 'Match has either not begun or has been postponed / cancelled'
+        elif event_status_id == 2:
+            event_status_name = 'In Progress'
+        elif event_status_id == 4:
+            event_status_name = 'Post game'
+
+        start_time_utc = self.start_time_utc(event)
+        home_team_name, away_team_name = self.team_names(event)
+        venue = event.get('venue') or {}
+
+        summary = {"league_name" : self.schema.league_name, "event_id" : event_id, "event_status" : event_status_name, "start_time_utc" : start_time_utc, "epoch_start_time" : scheduler.epoch_from_utc(start_time_utc) if start_time_utc else "", "home_team_name" : home_team_name, "away_team_name" : away_team_name, "venue_name" : venue.get('name',""), "venue_city" : venue.get('city',"")}
+        summary.update(self.summarize_play(self.last_play(event, event_status_id) or {}))
+        return EventSummary(**summary)
+
+    def summarize_play(self, play):
+        """Read the schema play fields and the player name from a play by play event"""
+        play_summary = dict((name, get(play)) for name, get in self.schema.play_fields)
+        play_summary['player_name'] = self.player_name(play)
+        return play_summary
+
+    def last_play(self, event, event_status_id):
+        """The latest play by play event, the highest play id among the last ten pbp entries
+        The light payload (pbp=False) has no pbp list, its lastPlay is the latest play.
+        """
+        if 'pbp' not in event:
+            return event.get('lastPlay')
+        pbp_list = event.get('pbp') or []
+        play_id = self.schema.play_id
+        return max(pbp_list[-10:], key=play_id, default=None)
+
+    def play_minute(self, play_summary):
+        """Match minute of a summarized play, used to bucket plays in the archive, leagues override this"""
+        return None
+
+    def player_name(self, play):
+        """Name of the player involved in a play by play event, leagues override this"""
+        return ''
+
+    def classify_play(self, play, scores_before=None):
+        """Map a play by play event to a stream change kind, None for plays not worth a change event
+        scores_before is the (home, away) score before the play, None when it is not known.
+        """
+        return None
+
+    def poll_phase(self, summary):
+        """Classify the match clock for the poll scheduler
+        Args:
+            summary (EventSummary): the summarize_event result for the match.
+        Returns:
+            tuple: (phase, break_mins) where phase is one of the scheduler phases and
+            break_mins the expected length of the break for scheduler.BREAK
+        """
+        if summary.event_status == 'Post game':
+            return scheduler.FINAL, 0
+        return scheduler.LIVE, 0
+
+    def stream(self, event_ids, interval=None, start_times=None):
+        """Follow live matches and yield a change event whenever something happens
+        Args:
+            event_ids (iterable of str): stats.com event ids to follow.
+            interval (float): seconds between polls of a live match.
+            start_times (dict): optional event id to start_time_utc map to sleep until kickoff.
+        Returns:
+            stream.LiveStream: iterator of stream.ChangeEvent, also accepts callbacks through subscribe()
+        """
+        return stream.LiveStream(self, event_ids, interval, start_times=start_times)
+
+    def start_time_utc(self, event):
+        start_time_utc = ""
+        for start_date in event.get('startDate') or []:
+            if start_date.get('dateType') == 'UTC':
+                start_time_utc = start_date.get('full',"")
+        return start_time_utc
+
+    def team_names(self, event):
+        home_team_name = away_team_name = ""
+        for team in event.get('teams') or []:
+            location_type = (team.get('teamLocationType') or {}).get('name')
+            if location_type == 'home':
+                home_team_name = team.get('location',"") + " " + team.get('nickname',"")
+            elif location_type == 'away':
+                away_team_name = team.get('location',"") + " " + team.get('nickname',"")
+        return home_team_name, away_team_name
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(type(self).__name__, self.config)
@@ -0,0 +1,152 @@
+import collections
+import time
+from tracker import PlayTracker
+from scheduler import PollScheduler
+
+
+STATUS = 'status'
+PERIOD = 'period'
+SCORE = 'score'
+GOAL = 'goal'
+TOUCHDOWN = 'touchdown'
+SUBSTITUTION = 'substitution'
+LAST_PLAY = 'last_play'
+#Sent once, with summary None, when a match is postponed or cancelled and stops being polled
+CANCELLED = 'cancelled'
+
+#Event statuses of a match that is going ahead: not started, in progress and final
+ACTIVE_STATUS_IDS = (1, 2, 4)
+
+#One change pushed to the consumers, play is None for status / period / score changes
+ChangeEvent = collections.namedtuple('ChangeEvent', ['kind', 'event_id', 'summary', 'play'])
+
+
+class LiveStream:
+    """ Polls live events and emits typed change events only when something changes"""
+    def __init__(self, request, event_ids, interval=None, max_interval=None, start_times=None):
+        """
+        request: EPLRequest or NFLRequest used to query the events API
+        event_ids (iterable of str): stats.com event ids to follow
+        interval (float): seconds between polls of a live match, defaults to config.POLL_INTERVAL
+        max_interval (float): ceiling the interval backs off to while a match is quiet, defaults to config.POLL_MAX_INTERVAL
+        start_times (dict): optional event id to start_time_utc map, as returned by get_events, to sleep until kickoff
+        """
+        self.request = request
+        self.scheduler = PollScheduler(request, interval=interval, max_interval=max_interval)
+        self.trackers = collections.OrderedDict((event_id, PlayTracker(request, event_id)) for event_id in event_ids)
+        self.summaries = {}
+        self.callbacks = []
+        self.errors = []
+        start_times = start_times or {}
+        for event_id in self.trackers:
+            self.scheduler.add(event_id, start_times.get(event_id))
+
+    def subscribe(self, callback):
+        """Register a callable invoked with every ChangeEvent by run()"""
+        self.callbacks.append(callback)
+
+    def follow(self, event_id, start_time_utc=None):
+        """Start following one more event, polled from the next poll_due"""
+        if event_id not in self.trackers:
+            self.trackers[event_id] = PlayTracker(self.request, event_id)
+        self.scheduler.add(event_id, start_time_utc)
+
+    def unfollow(self, event_id):
+        """Stop following an event and forget its tracker and last summary"""
+        self.scheduler.remove(event_id)
+        self.trackers.pop(event_id, None)
+        self.summaries.pop(event_id, None)
+
+    def poll_event(self, event_id):
+        """Poll one event and return the list of ChangeEvent since its previous poll"""
+        tracker = self.trackers[event_id]
+        new_plays = tracker.poll()
+        if new_plays is None:
+            return []
+        summary = self.request.summarize_event(tracker.event, event_id)
+        if isinstance(summary, str):
+            return []
+        previous = self.summaries.get(event_id)
+        self.summaries[event_id] = summary
+
+        changes = []
+        if previous is None or previous.event_status != summary.event_status:
+            changes.append(ChangeEvent(STATUS, event_id, summary, None))
+        if previous is None or previous.current_period != summary.current_period:
+            changes.append(ChangeEvent(PERIOD, event_id, summary, None))
+        if previous is None or (previous.home_score_after, previous.away_score_after) != (summary.home_score_after, summary.away_score_after):
+            changes.append(ChangeEvent(SCORE, event_id, summary, None))
+        #Plays seen on the first poll are history, only report what happens while streaming
+        if previous is not None:
+            scores = (previous.home_score_after, previous.away_score_after)
+            for play in new_plays:
+                kind = self.request.classify_play(play, scores)
+                if kind is not None:
+                    changes.append(ChangeEvent(kind, event_id, summary, play))
+                play_summary = self.request.summarize_play(play)
+                play_scores = (play_summary['home_score_after'], play_summary['away_score_after'])
+                if None not in play_scores:
+                    scores = play_scores
+        if new_plays:
+            changes.append(ChangeEvent(LAST_PLAY, event_id, summary, new_plays[-1]))
+        return changes
+
+    def poll_due(self, now=None):
+        """Poll every event whose turn has come and schedule its next poll
+        An event whose poll raised is rescheduled as quiet and its exception kept in errors.
+        Returns:
+            list: the ChangeEvent of all the events polled
+        """
+        changes = []
+        for event_id in self.scheduler.due(now):
+            try:
+                event_changes = self.poll_event(event_id)
+            except Exception as error:
+                self.errors.append((event_id, error))
+                event_changes = []
+            changes.extend(event_changes)
+            summary = self.summaries.get(event_id)
+            if summary is None:
+                if self._not_started(event_id):
+                    changes.append(ChangeEvent(CANCELLED, event_id, None, None))
+                    continue
+                summary = 'Match has not begun'
+            self.scheduler.update(event_id, summary, changed=bool(event_changes))
+        return changes
+
+    def _not_started(self, event_id):
+        """Schedule an event that could not be summarized from its payload
+        Records the kickoff time so the scheduler sleeps until it, and unschedules postponed
+        or cancelled matches.
+        Returns:
+            bool: True when the match was postponed or cancelled and is no longer polled
+        """
+        event = self.trackers[event_id].event
+        if event is None:
+            return False
+        if self.request.schema.event_status_id(event) not in ACTIVE_STATUS_IDS:
+            self.scheduler.remove(event_id)
+            return True
+        start_time_utc = self.request.start_time_utc(event)
+        if start_time_utc:
+            self.scheduler.set_start_time(event_id, start_time_utc)
+        return False
+
+    def done(self):
+        """True once every event has reached Post game"""
+        return len(self.scheduler) == 0
+
+    def __iter__(self):
+        """Yield ChangeEvent as they happen until every event has reached Post game"""
+        while not self.done():
+            for change in self.poll_due():
+                yield change
+            next_due = self.scheduler.next_due()
+            if next_due is not None:
+                time.sleep(max(0, next_due - time.time()))
+
+    def run(self):
+        """Stream until every event is over, invoking the subscribed callbacks"""
+        for change in self:
+            for callback in self.callbacks:
+                callback(change)
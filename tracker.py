@@ -0,0 +1,75 @@
+class PlayTracker:
+    """ Stateful per-event tracker returning only the plays added since the previous poll"""
+    def __init__(self, request, event_id):
+        """
+        request: EPLRequest or NFLRequest used to query the events API
+        event_id (str): the stats.com event id to track
+        """
+        self.request = request
+        self.event_id = event_id
+        self.play_id_field = request.play_id_field
+        self.last_play_id = None
+        self.event = None
+        #Switched off the first time the light payload comes back without a lastPlay
+        self.use_last_play = True
+        #Off while plays arrive several at a time between polls, a light probe would only find the gap
+        self.probe_light = True
+        self.light_fetches = 0
+        self.full_fetches = 0
+
+    def _get_event(self, pbp):
+        response = self.request.get_event_details(self.event_id, pbp=pbp)
+        if response is None:
+            return None
+        if pbp:
+            self.full_fetches += 1
+        else:
+            self.light_fetches += 1
+        return self.request.schema.event(response)
+
+    def poll(self):
+        """Fetch the event and return the plays added since the previous poll
+        The lastPlay of the light payload is used while the play ids advance one at a
+        time; the full pbp list is fetched on the first poll, whenever a gap is detected,
+        when lastPlay has no play id and for leagues whose light payload carries no lastPlay.
+        A gap costs two requests, the light probe then the full fetch, so after a poll that
+        found several new plays the next one goes straight to the full fetch.
+        Returns:
+            list: new play by play dicts in play order, or None if no response was received
+        """
+        if self.last_play_id is not None and self.use_last_play and self.probe_light:
+            event = self._get_event(pbp=False)
+            if event is None:
+                return None
+            last_play = event.get('lastPlay')
+            if last_play is None:
+                self.use_last_play = False
+            else:
+                self.event = event
+                play_id = last_play.get(self.play_id_field)
+                if play_id is not None and play_id <= self.last_play_id:
+                    return []
+                if play_id is not None and play_id == self.last_play_id + 1:
+                    self.last_play_id = play_id
+                    return [last_play]
+
+        event = self._get_event(pbp=True)
+        if event is None:
+            return None
+        self.event = event
+        pbp_list = event.get('pbp') or []
+        #Walk back from the end only as far as the last play already seen
+        new_plays = []
+        for pbp in reversed(pbp_list):
+            play_id = pbp.get(self.play_id_field)
+            if play_id is None:
+                continue
+            if self.last_play_id is not None and play_id <= self.last_play_id:
+                break
+            new_plays.append(pbp)
+        new_plays.reverse()
+        #The first poll returns the whole history, it says nothing about the pace of play
+        self.probe_light = self.last_play_id is None or len(new_plays) <= 1
+        if new_plays:
+            self.last_play_id = max(pbp.get(self.play_id_field) for pbp in new_plays)
+        return new_plays
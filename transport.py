@@ -0,0 +1,230 @@
+import json
+import logging
+import socket
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+from urllib3.util.retry import Retry
+from cache import ResponseCache
+from ratelimit import PRIORITY_LIVE, limiter_for, retry_after_seconds
+import metrics
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_decoder(name):
+    """Pick the function decoding response bodies
+    Args:
+        name (str): 'auto' for orjson when it is installed, 'orjson' or 'json' for the standard library
+    Returns:
+        function: decoder taking the raw response bytes
+    """
+    if name == 'orjson' or (name == 'auto' and orjson is not None):
+        if orjson is None:
+            raise ImportError('JSON_DECODER is set to orjson but orjson is not installed')
+        return orjson.loads
+    return json.loads
+
+
+logger = logging.getLogger(__name__)
+
+
+class TimedConnection:
+    """ Records the DNS and connect (TCP and TLS) time of new connections into metrics.record_timing"""
+    def _new_conn(self):
+        host = self._dns_host
+        started = time.perf_counter()
+        try:
+            addresses = list(dict.fromkeys(info[4][0] for info in socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)))
+        except socket.gaierror:
+            #Resolve again through urllib3 so it raises its usual NameResolutionError
+            addresses = [host]
+        metrics.record_timing('dns', time.perf_counter() - started)
+        try:
+            for index, address in enumerate(addresses):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except (ConnectTimeoutError, NewConnectionError):
+                    if index == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = host
+
+    def connect(self):
+        started = time.perf_counter()
+        dns_before = metrics.current_timing('dns')
+        super().connect()
+        metrics.record_timing('connect', time.perf_counter() - started - (metrics.current_timing('dns') - dns_before))
+
+
+class TimedHTTPConnection(TimedConnection, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnection, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """ HTTPAdapter whose new connections report their DNS and connect time"""
+    def init_poolmanager(self, *args, **kwargs):
+        HTTPAdapter.init_poolmanager(self, *args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
+
+
+class Transport:
+    """ Pooled keep-alive HTTP transport shared by the league request objects"""
+    def __init__(self, config):
+        """
+        config: object containing the HTTP pool, timeout and retry settings
+        """
+        self.config = config
+        self.timeout = (config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT)
+        #429 is left to get, which pauses the whole API key rate limiter rather than one connection
+        retry = Retry(total=config.HTTP_MAX_RETRIES,
+                      backoff_factor=config.HTTP_BACKOFF_FACTOR,
+                      status_forcelist=(500, 502, 503, 504),
+                      allowed_methods=frozenset(['GET']),
+                      raise_on_status=False,
+                      respect_retry_after_header=False)
+        self.metrics = metrics.REGISTRY if config.METRICS_ENABLED else None
+        adapter_class = TimedHTTPAdapter if self.metrics is not None and config.METRICS_CONNECTION_TIMINGS else HTTPAdapter
+        adapter = adapter_class(pool_connections=config.HTTP_POOL_CONNECTIONS,
+                              pool_maxsize=config.HTTP_POOL_SIZE,
+                              max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Accept': 'application/json',
+                                     'Accept-Encoding': 'gzip, deflate',
+                                     'Connection': 'keep-alive'})
+        self.cache = ResponseCache(config) if config.CACHE_ENABLED else None
+        self.loads = json_decoder(config.JSON_DECODER)
+        self.limiter = limiter_for(config)
+
+    def get(self, url, headers=None, priority=PRIORITY_LIVE, labels=None):
+        """Issue a GET request over the pooled session, within the API key rate limit
+        429 Too Many Requests pauses every request of the key for the Retry-After delay
+        (exponential backoff when the header is missing) and the request is retried.
+        Args:
+            url (str or callable): fully signed request url, or a callable signing it when the request is sent
+            headers (dict): optional extra request headers
+            priority (int): ratelimit priority, live events are served before schedule refreshes
+            labels (dict): metric labels of the request, eg: {'league': 'EPL', 'endpoint': 'event'}
+        Returns:
+            requests.Response: The response with its body read, or None if the connection failed after all retries.
+        """
+        labels = labels or {}
+        for attempt in range(self.config.HTTP_MAX_RETRIES + 1):
+            if self.limiter is not None:
+                self.limiter.acquire(priority)
+            response = self._send(url() if callable(url) else url, headers, labels)
+            if response is None:
+                return None
+            if response.status_code != 429 or attempt == self.config.HTTP_MAX_RETRIES:
+                return response
+            delay = retry_after_seconds(response.headers.get('Retry-After'), self.config.HTTP_BACKOFF_FACTOR * 2 ** attempt)
+            logger.warning('Rate limited by the API', extra=dict(labels, retry_after=delay, attempt=attempt + 1))
+            if self.limiter is not None:
+                self.limiter.pause(delay)
+            else:
+                time.sleep(delay)
+        return response
+
+    def _send(self, url, headers, labels):
+        """One GET over the session, timing its phases into the metrics registry"""
+        timings = metrics.start_timing()
+        started = time.perf_counter()
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+            headers_received = time.perf_counter()
+            content = response.content
+        except requests.exceptions.RequestException as error:
+            metrics.stop_timing()
+            #The exception text holds the signed url, only log its type and the url without its query string
+            logger.warning('Request failed', extra=dict(labels, error=type(error).__name__, url=url.split('?', 1)[0]))
+            if self.metrics is not None:
+                self.metrics.increment('requests_total', outcome='error', **labels)
+            return None
+        finished = time.perf_counter()
+        metrics.stop_timing()
+        dns = timings.get('dns', 0.0)
+        connect = timings.get('connect', 0.0)
+        wire_bytes = response.raw.tell() if hasattr(response.raw, 'tell') else len(content)
+        if self.metrics is not None:
+            if 'connect' in timings:
+                self.metrics.observe('http_dns_seconds', dns, **labels)
+                self.metrics.observe('http_connect_seconds', connect, **labels)
+            self.metrics.observe('http_ttfb_seconds', headers_received - started - dns - connect, **labels)
+            self.metrics.observe('http_download_seconds', finished - headers_received, **labels)
+            self.metrics.observe('http_response_bytes', len(content), metrics.BYTES_BUCKETS, **labels)
+            self.metrics.observe('http_wire_bytes', wire_bytes, metrics.BYTES_BUCKETS, **labels)
+            self.metrics.increment('requests_total', outcome=str(response.status_code), **labels)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('GET', extra=dict(labels, status=response.status_code, dns=round(dns, 6), connect=round(connect, 6),
+                                           ttfb=round(headers_received - started - dns - connect, 6),
+                                           download=round(finished - headers_received, 6), bytes=len(content), wire_bytes=wire_bytes))
+        return response
+
+    def get_json(self, url, cache_key=None, ttl=None, priority=PRIORITY_LIVE, labels=None):
+        """GET a JSON payload, served from the response cache while fresh
+        Stale entries are revalidated with If-None-Match / If-Modified-Since when the
+        API sent an ETag or Last-Modified header.
+        Args:
+            url (str or callable): fully signed request url, or a callable signing it when the request is sent
+            cache_key (str): key identifying the payload independently of the signature, None to bypass the cache
+            ttl (callable): maps the decoded payload to the number of seconds it may be cached
+            priority (int): ratelimit priority of the request
+            labels (dict): metric labels of the request, see get
+        Returns:
+            dict: The decoded JSON payload, or None if the request failed.
+        """
+        cache = self.cache if cache_key is not None else None
+        entry = cache.lookup(cache_key) if cache is not None else None
+        labels = labels or {}
+        if entry is not None and entry.fresh():
+            if self.metrics is not None:
+                self.metrics.increment('requests_total', outcome='cache', **labels)
+            return entry.value
+        headers = entry.validators() if entry is not None else None
+        response = self.get(url, headers=headers, priority=priority, labels=labels)
+        if response is None:
+            return None
+        if response.status_code == 304 and entry is not None:
+            cache.revalidated(cache_key, entry, ttl(entry.value))
+            return entry.value
+        if response.status_code != 200:
+            logger.warning('Unexpected response status', extra=dict(labels, status=response.status_code))
+            return None
+        with metrics.Stopwatch(self.metrics, 'json_decode_seconds', **labels):
+            payload = self.loads(response.content)
+        if cache is not None:
+            cache.store(cache_key, payload, ttl(payload), response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return payload
+
+    def close(self):
+        """Close every pooled connection and the on-disk cache"""
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()